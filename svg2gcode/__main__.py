@@ -38,7 +38,8 @@ def svg2gcode(args) -> int:
                'showimage':args.showimage, 'x_axis_maximum_travel':args.xmaxtravel,'y_axis_maximum_travel':args.ymaxtravel, 'image_noise':args.noise,
                'pass_depth':args.pass_depth, 'laser_mode':"constant" if args.constantburn else "dynamic", 'splitfile':args.splitfile, 'pathcut':args.pathcut,
                'nofill':args.nofill, 'image_poweroffset':args.poweroffset, 'image_overscan':args.overscan, 'image_showoverscan':args.showoverscan,
-               'color_coded': args.color_coded,})
+               'color_coded': args.color_coded, 'direct_fill_gcode':args.directfill,
+               'optimize_path_order':args.pathorder, 'parallel':not args.noparallel,})
 
     compiler = init_compiler(args)
 
@@ -156,6 +157,9 @@ def main() -> int:
     parser.add_argument('--splitfile', action='store_true', default=False, help='split gcode output of SVG path and image objects' )
     parser.add_argument('--pathcut', action='store_true', default=False, help='alway cut SVG path objects! (use laser power set with option --cuttingpower)' )
     parser.add_argument('--nofill', action='store_true', default=False, help='ignore SVG fill attribute' )
+    parser.add_argument('--directfill', action='store_true', default=False, help='emit gcode for SVG fill lines directly (faster, no fill image)' )
+    parser.add_argument('--pathorder', action='store_true', default=False, help='draw SVG paths in nearest neighbor order (shorter moves between paths)' )
+    parser.add_argument('--noparallel', action='store_true', default=False, help='convert images and fills in this process only (no worker processes)' )
     parser.add_argument('--xmaxtravel', default=cfg["xmaxtravel_default"], metavar="<default:" +str(cfg["xmaxtravel_default"])+ ">",
         type=int, help="machine x-axis lengh in mm")
     parser.add_argument('--ymaxtravel', default=cfg["ymaxtravel_default"], metavar="<default:" +str(cfg["ymaxtravel_default"])+ ">",
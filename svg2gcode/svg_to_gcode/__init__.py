@@ -41,6 +41,11 @@ SETTING 	= {
     "splitfile",                # boolean               return SVG path objects to <filename>.<gcext> and SVG image objects to <filename>_images.<gcext>
     "pathcut",                  # boolean               always cut SVG path objects! use laser_power setting
     "nofill",                   # boolean               ignore SVG fill attribute
+    "direct_fill_gcode",        # boolean               emit gcode for SVG fill lines directly (not via a fill image)
+    "optimize_path_order",      # boolean               draw SVG path objects in nearest neighbor order (shorter moves between paths)
+                                #                       instead of document order
+    "parallel",                 # boolean               convert images and fills in worker processes (when there are enough of them
+                                #                       and multiple cpus are available)
     "color_coded"               # string                color of path determines whether it is a cut or engrave
 }
 
@@ -76,6 +81,9 @@ DEFAULT_SETTING 	= {
     "splitfile":                False,          # SVG path and image objects are emitted to one file: <filename>.<gcext>
     "pathcut":                  False,          # always cut SVG path objects! use laser_power setting
     "nofill":                   False,          # ignore SVG fill attribute
+    "direct_fill_gcode":        False,          # fills are converted to a raster image first
+    "optimize_path_order":      False,          # paths are drawn in document order
+    "parallel":                 True,           # use multiple cpus when available
     "color_coded":              str             # color of path determines whether it is a cut or engrave
 }
 
@@ -118,7 +126,7 @@ def check_setting(setting: dict[str,Any] =None) -> bool:
             raise ValueError(f"Unknown '{key}' value '{setting[key]}'. Please specify one of the following: {UNITS}")
         if key == "distance_mode" and setting[key] not in DISTANCEMODE:
             raise ValueError(f"Unknown '{key}' value '{setting[key]}'. Please specify one of the following: {DISTANCEMODE}")
-        if key in {"fan","showimage","splitfile","pathcut","nofill","image_showoverscan"} and setting[key] not in {True,False}:
+        if key in {"fan","showimage","splitfile","pathcut","nofill","direct_fill_gcode","optimize_path_order","parallel","image_showoverscan"} and setting[key] not in {True,False}:
             raise ValueError(f"Unknown '{key}' value '{setting[key]}'. Please specify one of the following: {{True,False}}")
         if key == "pixel_size" and setting[key] and (not isinstance(setting[key],(float)) or setting[key] <= 0):
             raise TypeError(f"'{key}' is of type '{type(setting[key])}' but should be of type {type(1.0)} and have a value > 0.0")
@@ -1,24 +1,28 @@
 import os
 import re
+import collections
+import concurrent.futures
+import itertools
 import logging
 import math
-import copy
 
 from io import BytesIO
 from typing import Any
 
-import base64
+import binascii
 from datetime import datetime
 from PIL import Image
 import numpy as np
 
 from svg2gcode.svg_to_gcode.compiler.interfaces import Interface
+from svg2gcode.svg_to_gcode.compiler._image2gcode import RunLengthImage2gcode
 from svg2gcode.svg_to_gcode.geometry import Curve
 from svg2gcode.svg_to_gcode.geometry import LineSegmentChain, Vector, RasterImage
 from svg2gcode.svg_to_gcode import DEFAULT_SETTING
 from svg2gcode.svg_to_gcode import TOLERANCES, SETTING, check_setting
 
 from svg2gcode.svg_to_gcode import css_color
+from svg2gcode.svg_to_gcode.jit import njit
 from svg2gcode.svg_to_gcode.svg_parser import NAMESPACES, ElementTreeParent
 
 from svg2gcode import __version__
@@ -31,6 +35,162 @@ logging.basicConfig(format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# style attribute fields (see parse_style_attribute)
+_STYLE_FILL = re.compile(r'fill:([^;]+);')
+_STYLE_FILL_RULE = re.compile(r'fill-rule:(evenodd|nonzero)')
+_STYLE_FILL_OPACITY = re.compile(r'fill-opacity:((?:\d*\.)?\d+)')
+_STYLE_STROKE = re.compile(r'stroke:([^;]+);')
+_STYLE_STROKE_WIDTH = re.compile(r'stroke-width:((?:\d*\.)?\d+)')
+_STYLE_STROKE_OPACITY = re.compile(r'stroke-opacity:((?:\d*\.)?\d+)')
+_STYLE_PATHCUT = re.compile(r'gcode-pathcut:(true|false)')
+_NUMBER = re.compile(r'(?:\d*\.)?\d+')
+# 'file:' or 'data:' prefix (MIME part) of an image 'xlink:href' field
+_HREF_PREFIX = re.compile(r'^file://|^data:[a-z0-9;/]+,', re.I)
+
+# write buffer size of gcode files (gcode is written command by command)
+FILE_BUFFER_SIZE = 1 << 20
+
+# maximum number of shapes to keep delta chains of (see Compiler.get_delta_chain)
+SHAPE_CACHE_SIZE = 256
+
+# minimum number of image and fill jobs to start worker processes for (see Compiler.append_curves)
+# (fewer jobs do not make up for the start up time of the workers)
+PARALLEL_MIN_JOBS = 4
+
+def available_cpus() -> int:
+    """
+    Return the number of cpus this process may run on (cpu affinity, when the platform supports it).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+@njit(cache=True)
+def _scan_evenodd(image_mark: np.ndarray, scan_error: int) -> list[tuple[int,int,int]]:
+    """
+    Scan the marker image lines and apply 'evenodd' fill (see step 3 of the fill in Compiler.append_curves).
+    Border pixels have value 10, pixels just inside the border have value 128.
+    Lines are scanned alternating from left to right and from right to left.
+    Return a list of fill spans (x start, x end, y) in pixels.
+    """
+    spans = []
+    height, width = image_mark.shape
+    go_right = True
+    # start scanning to the right
+    for y in range(height):
+        evenodd = 0
+        start = 0
+
+        # classify the line pixels: border (1), inside border (2) or other (0)
+        line = np.zeros(width, dtype=np.uint8)
+        line[image_mark[y] == 10] = 1
+        line[image_mark[y] == 128] = 2
+        # run length encode the borders (possibly having multiple pixels): border i starts at
+        # border_start[i] and ends just before border_end[i]
+        edges = np.diff(np.concatenate((np.zeros(1, dtype=np.int8), (line == 1).astype(np.int8), np.zeros(1, dtype=np.int8))))
+        border_start = np.flatnonzero(edges == 1)
+        border_end = np.flatnonzero(edges == -1)
+
+        if go_right:
+            # scan to the right
+            for i in range(border_start.size):
+                # found a border
+                x = border_start[i]
+                x_b = border_end[i]
+
+                xscan_b = x - 1
+                while xscan_b > 0 and xscan_b > (x - scan_error) and line[xscan_b] == 0:
+                    xscan_b -= 1
+                xscan_a = x_b
+                while xscan_a < width and xscan_a < (x_b + scan_error) and line[xscan_a] == 0:
+                    xscan_a += 1
+
+                if xscan_b >= 0 and line[xscan_b] == 2:
+                    # found border
+                    if evenodd % 2 == 0:
+                        start = x
+                    else:
+                        spans.append((start, x, y))
+                    evenodd = evenodd + 1
+                if xscan_a < width and line[xscan_a] == 2:
+                    # found border
+                    if evenodd % 2 == 0:
+                        start = x
+                    else:
+                        spans.append((start, x_b, y))
+                    evenodd = evenodd + 1
+        else:
+            # scan to the left
+            for i in range(border_start.size - 1, -1, -1):
+                # found a border
+                x = border_end[i] - 1
+                x_b = border_start[i] - 1
+
+                xscan_b = x_b
+                while xscan_b > 0 and xscan_b > (x_b - scan_error) and line[xscan_b] == 0:
+                    xscan_b -= 1
+                xscan_a = x + 1
+                while xscan_a < width and xscan_a < (x + scan_error) and line[xscan_a] == 0:
+                    xscan_a += 1
+
+                if xscan_a < width and line[xscan_a] == 2:
+                    # found border
+                    if evenodd % 2 == 0:
+                        start = x
+                    else:
+                        spans.append((start, x, y))
+                    evenodd = evenodd + 1
+                if xscan_b >= 0 and line[xscan_b] == 2:
+                    # found border
+                    if evenodd % 2 == 0:
+                        start = x
+                    else:
+                        spans.append((start, x_b, y))
+                    evenodd = evenodd + 1
+
+        # switch scan direction
+        go_right = not go_right
+
+    return spans
+
+@njit(cache=True)
+def _draw_lines(img: np.ndarray, lines: np.ndarray, color: int):
+    """
+    Draw lines (x1, y1, x2, y2) - in pixels - from - and including - start (x1,y1) to - and including - end (x2,y2).
+    Pixels outside the image are skipped.
+    """
+    height, width = img.shape
+    for i in range(lines.shape[0]):
+        x1, y1, x2, y2 = int(lines[i,0]), int(lines[i,1]), int(lines[i,2]), int(lines[i,3])
+
+        if x1 == x2 and y1 != y2:
+            # vertical line
+            if 0 <= x1 < width:
+                diy = 1 if y2 > y1 else -1
+                for y in range(y1, y2 + diy, diy):
+                    if 0 <= y < height:
+                        img[y,x1] = color
+        else:
+            # non vertical line (or a point)
+            # calculate the slope of the line and its offset from the origin
+            slope = (y1 - y2) / (x1 - x2) if x1 != x2 else 1.0
+            offset = y1 - slope * x1
+
+            dix = 1 if x2 > x1 else -1
+            prev_y = y1
+            for x in range(x1, x2 + dix, dix):
+                y = round(slope * x + offset)
+                if 0 <= x < width:
+                    if abs(y - prev_y) > 1:
+                        di = 1 if y > prev_y else -1
+                        for y_gap in range(prev_y + di, y, di):
+                            if 0 <= y_gap < height:
+                                img[y_gap,x] = color
+
+                    if 0 <= y < height:
+                        img[y,x] = color
+                prev_y = y
+
 class Compiler:
     """
     The Compiler class handles the process of drawing geometric objects using interface commands and assembling the
@@ -59,11 +219,8 @@ class Compiler:
 
         # save params
         self.params = params
-	# get default settings
-        self.settings = copy.deepcopy(DEFAULT_SETTING)
-        # and update
-        for key in params.keys():
-            self.settings[key] = params[key]
+	# get default settings and update them (all values are immutable, a shallow copy will do)
+        self.settings = {**DEFAULT_SETTING, **params}
 
         self.interface.set_machine_parameters(self.settings)
 
@@ -81,11 +238,26 @@ class Compiler:
                        self.interface.set_distance_mode(self.settings["distance_mode"])] + custom_header
         self.footer = custom_footer
 
-        # path gcode
+        # path gcode (line chain code is one item, see append_line_chain)
         self.body: list[str] = []
         # image gcode
         self.gcode: list[str] = []
 
+        # parsed style attributes by path attribute dict id (all curves of a path share one dict)
+        self._style_cache: dict[int, tuple[dict, dict]] = {}
+
+        # delta chains of the current 'name_id', by (line chain id, offset)
+        # (stroke steps and the fill steps ask for the same delta chains)
+        self._delta_chains: dict[tuple[int, float], LineSegmentChain] = {}
+        # delta chain segments (and the start of the line chain) by (shape, offset) of recent 'name_id's, the shape is
+        # the line chain relative to its start (a shape drawn at multiple locations has one delta chain, translated
+        # to each location); least recently used shapes are dropped (SHAPE_CACHE_SIZE)
+        self._shape_delta_chains: collections.OrderedDict[tuple[bytes, float], tuple[np.ndarray, np.ndarray]] = \
+                                                                                                collections.OrderedDict()
+
+        # raster image buffer for the fills (see fill_path step 1)
+        self._fill_buffer = np.empty(0, dtype=np.uint8)
+
     def gcode_file_header(self):
 
         gcode = []
@@ -93,35 +265,29 @@ class Compiler:
         if not self.check_bounds():
             if self.settings["distance_mode"] == "absolute" and self.check_axis_maximum_travel():
                 logger.warn("Cut is not within machine bounds.")
-                gcode += ["; WARNING: Cut is not within machine bounds of "
-                          f"X[0,{self.settings['x_axis_maximum_travel']}], Y[0,{self.settings['y_axis_maximum_travel']}]\n",]
+                gcode.append("; WARNING: Cut is not within machine bounds of "
+                             f"X[0,{self.settings['x_axis_maximum_travel']}], Y[0,{self.settings['y_axis_maximum_travel']}]\n")
             elif not self.check_axis_maximum_travel():
                 # logger.warn("Please define machine cutting area, set parameter: 'x_axis_maximum_travel' and 'y_axis_maximum_travel'")
-                gcode += ["; WARNING: Please define machine cutting area, set parameter: 'x_axis_maximum_travel' and 'y_axis_maximum_travel'\n",]
+                gcode.append("; WARNING: Please define machine cutting area, set parameter: 'x_axis_maximum_travel' and 'y_axis_maximum_travel'\n")
             else:
-                gcode += [f"; WARNING: distance mode is not absolute: {self.settings['distance_mode']}\n",]
+                gcode.append(f"; WARNING: distance mode is not absolute: {self.settings['distance_mode']}\n")
 
 	# add generator info and boundingbox for this code
 
         # get program parameters
-        params = ''
-        for k, v in self.params.items():
-            if params != '':
-                params += ",\n"
-            if hasattr(v, 'name'):
-                params += f";      {k}: {os.path.basename(v.name)}"
-            else:
-                params += f";      {k}: {v}"
+        params = ",\n".join(f";      {k}: {os.path.basename(v.name) if hasattr(v, 'name') else v}"
+                             for k, v in self.params.items())
 
-        gcode += [ f";    svg2gcode {__version__} ({str(datetime.now()).split('.')[0]})",
-                   f";    arguments: \n{params}",]
+        gcode.extend((f";    svg2gcode {__version__} ({str(datetime.now()).split('.')[0]})",
+                      f";    arguments: \n{params}"))
         if self.boundingbox.get():
             center = self.boundingbox.center()
-            gcode += [ f";    {self.boundingbox}",
-                       f";    boundingbox center: (X{center[0]:.{0 if center[0].is_integer() else self.precision}f},"
-                       f"Y{center[1]:.{0 if center[1].is_integer() else self.precision}f})" ]
+            gcode.extend((f";    {self.boundingbox}",
+                          f";    boundingbox center: (X{center[0]:.{0 if center[0].is_integer() else self.precision}f},"
+                          f"Y{center[1]:.{0 if center[1].is_integer() else self.precision}f})"))
 
-        gcode += [ f";    GRBL 1.1, unit={self.settings['unit']}, {self.settings['distance_mode']} coordinates" ]
+        gcode.append(f";    GRBL 1.1, unit={self.settings['unit']}, {self.settings['distance_mode']} coordinates")
 
         return '\n'.join(gcode) + '\n'
 
@@ -138,37 +304,45 @@ class Compiler:
             logger.debug("Compile with an empty body (no curves).")
             return ''
 
+        return '\n'.join(self.compile_iter(passes))
+
+    def compile_iter(self, passes=1):
+        """
+        Yields the code of compile, item by item: commands or the code of a line chain (empty items are left out).
+        """
         fan_off = False
-        gcode = []
         for i in range(passes):
-            gcode += [f"; pass #{i+1}"]
-            gcode.extend(self.body)
+            yield f"; pass #{i+1}"
+            # (the body has no empty items, see append_line_chain)
+            yield from self.body
 
             if i < (passes - 1) and self.settings["pass_depth"] > 0:
                 # If it isn't the last pass, turn off the laser and move down
-                gcode.append(self.interface.laser_off(fan_off))
-                gcode.append(self.interface.set_relative_coordinates())
-                gcode.append(self.interface.linear_move(z=-self.settings["pass_depth"]))
-                gcode.append(self.interface.set_distance_mode(self.settings["distance_mode"]))
-
-        # remove all ""
-        gcode = filter(lambda command: len(command) > 0, gcode)
-
-        return '\n'.join(gcode)
+                for command in (self.interface.laser_off(fan_off),
+                                self.interface.set_relative_coordinates(),
+                                self.interface.linear_move(z=-self.settings["pass_depth"]),
+                                self.interface.set_distance_mode(self.settings["distance_mode"])):
+                    if command:
+                        yield command
 
     def compile_images(self):
 
         """
         Assembles the code in the header, body and footer.
         """
+        return '\n'.join(self.compile_images_iter())
 
+    def compile_images_iter(self):
+        """
+        Yields the code of compile_images, command by command.
+        """
         # laser off, fan on, M3 or M4 burn mode
-        header_gc = ["M5"]
+        yield "M5"
         if self.settings['fan'] and self.settings["splitfile"]:
-            header_gc += ['M8']
-        header_gc += ['M3' if self.settings["laser_mode"] == "constant" else 'M4']
+            yield 'M8'
+        yield 'M3' if self.settings["laser_mode"] == "constant" else 'M4'
 
-        return '\n'.join(header_gc + self.gcode)
+        yield from self.gcode
 
     def compile_to_file(self, file_name: str, svg_file_name: str, curves: list[Curve], passes=1):
         """
@@ -185,36 +359,47 @@ class Compiler:
 	# generate gcode for 'path' and 'image' svg tags (calculate bbox)
         self.append_curves(curves)
 
+        # the file header(s) and footer are the same for both files (bbox is known at this point)
+        file_header = self.gcode_file_header() if (len(self.body) > 0 or len(self.gcode) > 0) else ""
         header = '\n'.join(self.header) + '\n'
         footer = '\n'.join(self.footer) + '\n'
+        splitfile = self.settings["splitfile"]
 
         if len(self.body) > 0:
             # write path objects
-            with open(file_name, 'w') as file:
+            # (the code is written command by command, instead of joining it to one string first)
+            with open(file_name, 'w', buffering=FILE_BUFFER_SIZE) as file:
                 #emit_program_end = self.interface.program_end() if (self.settings["splitfile"] or len(self.gcode) == 0) else ""
-                program_end = footer if (self.settings["splitfile"] or len(self.gcode) == 0) else ""
-                file.write(self.gcode_file_header() + header + self.compile(passes=passes) + '\n' + program_end)
+                program_end = footer if (splitfile or len(self.gcode) == 0) else ""
+                file.write(file_header + header)
+                file.writelines(f"{command}\n" for command in self.compile_iter(passes=passes))
+                file.write(program_end)
                 logger.info(f"Generated {file_name}")
         else:
             logger.warn(f'No path (curve) data found nothing added to "{file_name}"')
 
         image_file_name = file_name.rsplit('.',1)[0] + "_images." + file_name.rsplit('.',1)[1]
         if len(self.gcode) == 0:
-            if self.settings["splitfile"]:
+            if splitfile:
                 logger.warn(f"No image found, skipping '{image_file_name}'")
             else:
                 logger.warn(f"No image found in file '{svg_file_name}'")
         else:
-            if self.settings["splitfile"]:
+            if splitfile:
                 # emit image objects to <filename>_images.<gcext>
-                with open(image_file_name, 'w') as file:
-                    file.write(self.gcode_file_header() + header + self.compile_images() + '\n' + footer)
+                with open(image_file_name, 'w', buffering=FILE_BUFFER_SIZE) as file:
+                    file.write(file_header + header)
+                    # (image code can be huge, write it as is instead of copying it to append a newline)
+                    file.writelines(itertools.chain.from_iterable((command, "\n") for command in self.compile_images_iter()))
+                    file.write(footer)
                     logger.info(f"Generated {image_file_name}")
             else:
                 # emit images objects in same file
                 open_mode = 'w' if len(self.body) == 0 else 'a+'
-                with open(file_name, open_mode) as file:
-                    file.write((self.gcode_file_header() if len(self.body) == 0 else "") + '\n' +  self.compile_images() + '\n' + footer)
+                with open(file_name, open_mode, buffering=FILE_BUFFER_SIZE) as file:
+                    file.write((file_header if len(self.body) == 0 else "") + '\n')
+                    file.writelines(itertools.chain.from_iterable((command, "\n") for command in self.compile_images_iter()))
+                    file.write(footer)
                     logger.info(f"Added image(s) to {file_name}")
 
     def append_line_chain(self, line_chain: LineSegmentChain, step: float, color: int = None, speed: int = None):
@@ -235,46 +420,47 @@ class Compiler:
         code = [f"\n; delta: {step}"]
         start = line_chain.get(0).start
 
+        interface = self.interface
+        settings = self.settings
+        linear_move = interface.linear_move
+
         # set laser power to color value when svg attribute 'stroke' (color) is set
-        laser_power = color if color is not None else self.settings["laser_power"]
-        movement_speed = speed if speed is not None else self.settings["movement_speed"]
+        laser_power = color if color is not None else settings["laser_power"]
+        movement_speed = speed if speed is not None else settings["movement_speed"]
+        laser_mode = settings["laser_mode"]
 
         # do not turn fan off
         fan_off = False
 
 	# Move to the next line_chain when the next line segment doesn't connect to the end of the previous one.
-        if self.interface.position is None or abs(self.interface.position - start) > TOLERANCES["operation"]:
-            if self.interface.position is None or self.settings["rapid_move"]:
+        if interface.position is None or abs(interface.position - start) > TOLERANCES["operation"]:
+            if interface.position is None or settings["rapid_move"]:
                 # move to the next line_chain: set laser off, rapid move to start of chain,
                 # set movement (cutting) speed, set laser mode and power on
-                code += [self.interface.laser_off(fan_off), self.interface.rapid_move(start.x, start.y),
-                        self.interface.set_movement_speed(movement_speed),
-                        self.interface.set_laser_mode(self.settings["laser_mode"]), self.interface.set_laser_power_value(laser_power,self.fan_on)]
+                code += [interface.laser_off(fan_off), interface.rapid_move(start.x, start.y),
+                        interface.set_movement_speed(movement_speed),
+                        interface.set_laser_mode(laser_mode), interface.set_laser_power_value(laser_power,self.fan_on)]
             else:
                 # move to the next line_chain: set laser mode, set laser power to 0 (cutting is off),
                 # set movement speed, (no rapid) move to start of chain, set laser to power
-                code += [self.interface.set_laser_mode(self.settings["laser_mode"]), self.interface.set_laser_power_value(0,self.fan_on),
-                        self.interface.set_movement_speed(movement_speed), self.interface.linear_move(start.x, start.y),
-                        self.interface.set_laser_power_value(laser_power)]
+                code += [interface.set_laser_mode(laser_mode), interface.set_laser_power_value(0,self.fan_on),
+                        interface.set_movement_speed(movement_speed), linear_move(start.x, start.y),
+                        interface.set_laser_power_value(laser_power)]
             self.fan_on = False
 
             self.boundingbox.update(start)
 
-            if self.settings["dwell_time"] > 0:
-                code += [self.interface.dwell(self.settings["dwell_time"])] + code
-
-        for line in line_chain:
-            code.append(self.interface.linear_move(line.end.x, line.end.y))
-            self.boundingbox.update(line.end)
+            if settings["dwell_time"] > 0:
+                code += [interface.dwell(settings["dwell_time"])] + code
 
-        self.body.extend(code)
+        # move along the chain, the code of the chain is added to the body as one item (instead of an item per command)
+        # (interface commands that have no effect are empty, these are left out)
+        endpoints = line_chain.endpoints()
+        self.body.append('\n'.join(filter(None, itertools.chain(code, map(linear_move, *endpoints.T.tolist())))))
 
-    def isBase64(self, b64str):
-        try:
-            base64.b64decode(b64str)
-            return True
-        except Exception as e:
-            return False
+        # update the boundingbox with the extremes of the chain (instead of point by point)
+        self.boundingbox.update(endpoints.min(axis=0).tolist())
+        self.boundingbox.update(endpoints.max(axis=0).tolist())
 
     def decode_base64(self, base64_string):
         """
@@ -290,7 +476,7 @@ class Compiler:
 
         # strip either 'file:...' or 'data:...' prefix (MIME part) from field 'xlink:href'
         is_link = not base64_string.startswith('data')
-        fileordata = re.sub("(^file://|^data:[a-z0-9;/]+,)","", base64_string, flags=re.I)
+        fileordata = _HREF_PREFIX.sub("", base64_string, count=1)
 
         # if os.path.isfile(fileordata):
         if is_link:
@@ -302,16 +488,19 @@ class Compiler:
                 logger.error("Unable to find image : %s", img_file)
                 return
 
-        elif self.isBase64(fileordata):
-            # convert to right form
-            imgdata = base64.b64decode(fileordata)
+        else:
+            # convert to right form (decode once, invalid data raises an error)
+            # Note that validation is not strict: line breaks in embedded data are allowed (and skipped).
+            # Note also that a2b_base64 decodes the (ascii) string as is, base64.b64decode would encode a copy first.
+            try:
+                imgdata = binascii.a2b_base64(fileordata)
+            except ValueError:
+                # Neither file nor data (binascii.Error or non ascii characters)
+                logger.error("Unable to read image data: %s", base64_string[:30])
+                return
 
             # open as binary file
             img_file = BytesIO(imgdata)
-        else:
-            # Neither file nor data
-            logger.error("Unable to read image data: %s", base64_string[:30])
-            return
 
         return Image.open(img_file)
 
@@ -326,12 +515,24 @@ class Compiler:
 
         # convert image to new size
         if img is not None:
-            # add alpha channel
-            img = img.convert("RGBA")
+            if img.mode == "L":
+                # already black&white without alpha, no conversion needed
+                pass
+            elif img.mode in ("RGB", "P", "1") and 'transparency' not in img.info:
+                # no alpha channel, convert to black&white before resizing (resize one channel instead of three)
+                img = img.convert("L")
+            else:
+                # convert to black&white with alpha channel
+                img = img.convert("LA")
 
-            # create a white background and add it to the image
-            img_background = Image.new(mode = "RGBA", size = img.size, color = (255,255,255))
-            img = Image.alpha_composite(img_background, img)
+                if img.getextrema()[1] == (255, 255):
+                    # fully opaque, the white background does not show
+                    img = img.getchannel("L")
+                else:
+                    # put the image on a white background, before resizing (resize one channel instead of four)
+                    img = np.asarray(img, dtype=np.uint16)
+                    gray, alpha = img[...,0], img[...,1]
+                    img = Image.fromarray(((gray * alpha + 255 * (255 - alpha) + 127) // 255).astype(np.uint8), mode = "L")
 
             # Note that the image resize action below is based on the following:
             # - the image data (linked file or embedded) has a certain source resolution (number of pixels WidthxHeight)
@@ -347,9 +548,11 @@ class Compiler:
             #   (make it lower resolution), if the calculation results in upsampling of the source image (make it higher resolution)
             #   it does make a difference because the resized image can be blocky
 
-            # convert image to black&white (without alpha) and new size)'
+            # convert image to new size
+            # (when downsampling a lot, reduce the image by an integer factor first - box filter - and apply
+            #  the lanczos filter to the remaining image, which keeps at least 'reducing_gap' times the new size)
             img = img.resize((int(float(img_attrib['width'])/float(pixelsize)),
-                            int(float(img_attrib['height'])/float(pixelsize))), Image.Resampling.LANCZOS).convert("L")
+                            int(float(img_attrib['height'])/float(pixelsize))), Image.Resampling.LANCZOS, reducing_gap=3.0)
 
             if self.settings['showimage']:
                 img.show()
@@ -359,132 +562,404 @@ class Compiler:
 
         return None
 
+    def append_image(self, image: str, img_attrib: dict[str, Any], transformation = None):
+        """
+        Draws an image (svg 'image' tag).
+        The gcode is added to the image gcode.
+        """
+        # convert image (scale and type)
+        img = self.convert_image(image, img_attrib)
+
+        if img is not None:
+            # Draw image by converting raster image scan lines to gcode, possibly applying tranformations on each pixel
+            self.image2gcode(img_attrib, img, transformation)
+
     def image2gcode(self, img_attrib: dict[str, Any], img=None, transformation = None, power = None):
 
         # create image conversion object
-        convert = Image2gcode(transformation = transformation.apply_affine_transformation if transformation is not None else None, power = power)
+        convert = RunLengthImage2gcode(transformation = transformation.apply_affine_transformation if transformation is not None else None, power = power)
 
         #
         # set arguments
 
         # get svg image attribute/object info (set in Inkscape for example) when available
         # else set tool invocation values
-        arguments = {}
-        arguments["pixelsize"] = img_attrib['gcode_pixelsize'] if 'gcode_pixelsize' in img_attrib else self.settings["pixel_size"]
-        arguments["maxpower"] = img_attrib['gcode_maxpower'] if 'gcode_maxpower' in img_attrib else self.settings["maximum_image_laser_power"]
-        arguments["poweroffset"] = img_attrib['gcode_poweroffset'] if 'gcode_poweroffset' in img_attrib else self.settings["image_poweroffset"]
-        arguments["speed"] = img_attrib['gcode_speed'] if 'gcode_speed' in img_attrib else self.settings["image_movement_speed"]
-        arguments["noise"] = img_attrib['gcode_noise'] if 'gcode_noise' in img_attrib else self.settings["image_noise"]
-        arguments["speedmoves"] = img_attrib['gcode_speedmoves'] if 'gcode_speedmoves' in img_attrib else self.settings["rapid_move"]
-        arguments["overscan"] = img_attrib['gcode_overscan'] if 'gcode_overscan' in img_attrib else self.settings["image_overscan"]
-        arguments["showoverscan"] = img_attrib['gcode_showoverscan'] if 'gcode_showoverscan' in img_attrib else self.settings["image_showoverscan"]
-        arguments["offset"] = (float(img_attrib['x']), float(img_attrib['y']))
-        arguments["name"] = img_attrib['id']
-        arguments["invert"] = img_attrib['invert'] if 'invert' in img_attrib else True
+        arguments = {
+            "pixelsize": img_attrib.get('gcode_pixelsize', self.settings["pixel_size"]),
+            "maxpower": img_attrib.get('gcode_maxpower', self.settings["maximum_image_laser_power"]),
+            "poweroffset": img_attrib.get('gcode_poweroffset', self.settings["image_poweroffset"]),
+            "speed": img_attrib.get('gcode_speed', self.settings["image_movement_speed"]),
+            "noise": img_attrib.get('gcode_noise', self.settings["image_noise"]),
+            "speedmoves": img_attrib.get('gcode_speedmoves', self.settings["rapid_move"]),
+            "overscan": img_attrib.get('gcode_overscan', self.settings["image_overscan"]),
+            "showoverscan": img_attrib.get('gcode_showoverscan', self.settings["image_showoverscan"]),
+            "offset": (float(img_attrib['x']), float(img_attrib['y'])),
+            "name": img_attrib['id'],
+            "invert": img_attrib.get('invert', True),
+        }
 
         # get image parameters
-        params = ''
-        for k, v in arguments.items():
-            if params != '':
-                params += ",\n"
-            params += f";      {k}: {v}"
+        params = ',\n'.join(f";      {k}: {v}" for k, v in arguments.items())
 
-        self.gcode += [f"; image:\n{params}"]
+        self.gcode.append(f"; image:\n{params}")
 
         # get gcode for image
-        self.gcode += [convert.image2gcode(img, arguments)]
+        self.gcode.append(convert.image2gcode(img, arguments))
 
         # update bounding box info
         bbox_image = convert.bbox.get()
         self.boundingbox.update(bbox_image[0])
         self.boundingbox.update(bbox_image[1])
 
+    def fill_spans2gcode(self, name_id: str, spans: list[tuple[int,int,int]], image_mark: np.ndarray, offset: (float,float),
+                         fill_color: int, skip_border: bool):
+        """
+        Draw fill spans directly, without a fill image (setting 'direct_fill_gcode').
+        The gcode is added to the image gcode, like fills converted by image2gcode.
+
+        :param name_id: name of the filled path.
+        :param spans: fill spans (x start, x end, y) in pixels of image_mark, in drawing direction.
+        :param image_mark: the fill marker image (border pixels have value 10).
+        :param offset: (x,y) location of pixel (0,0).
+        :param fill_color: fill (pixel) value.
+        :param skip_border: do not draw border pixels (the border is part of the stroke).
+        """
+        pixel_size = self.settings["pixel_size"]
+        # laser power of the fill color (as image2gcode would do for a pixel of this value)
+        power = Image2gcode.linear_power(fill_color, self.settings["maximum_image_laser_power"], self.settings["image_poweroffset"], False)
+
+        if not spans or power <= self.settings["image_noise"]:
+            return
+
+        # set X/Y-axis precision to the number of digits after the decimal point (see image2gcode)
+        XY_prec = len(str(pixel_size).split('.')[1])
+
+        code = [f"; fill (direct): '{name_id}'", f"G1F{self.settings['image_movement_speed']}"]
+        for x_start, x_end, y in spans:
+            low, high = min(x_start, x_end), max(x_start, x_end)
+            if skip_border:
+                # split the span in parts that are not border
+                edges = np.diff(np.concatenate(([0], image_mark[y, low:high + 1] != 10, [0])).astype(np.int8))
+                parts = list(zip((np.flatnonzero(edges == 1) + low).tolist(), (np.flatnonzero(edges == -1) + low).tolist()))
+            else:
+                parts = [(low, high + 1)]
+
+            # pixel x is drawn from X(x) to X(x + 1)
+            Y = round(offset[1] + y * pixel_size, XY_prec)
+            if x_start > x_end:
+                # draw from right to left
+                parts = [(end, start) for start, end in reversed(parts)]
+            for start, end in parts:
+                code.extend((f"G0X{round(offset[0] + start * pixel_size, XY_prec)}Y{Y}",
+                             f"G1X{round(offset[0] + end * pixel_size, XY_prec)}S{power}"))
+
+        self.gcode.append('\n'.join(code))
+
+        # update bounding box info
+        spans = np.array(spans)
+        self.boundingbox.update((offset[0] + spans[:,:2].min() * pixel_size, offset[1] + spans[:,2].min() * pixel_size))
+        self.boundingbox.update((offset[0] + (spans[:,:2].max() + 1) * pixel_size, offset[1] + spans[:,2].max() * pixel_size))
+
+    def draw_lines(self, img: np.array, lines: np.array, gray: int, pixel_size: float):
+        """
+        Draws lines (x1, y1, x2, y2) from - and including - (x1,y1) to - and including - (x2,y2).
+        Lines having negative coordinates are skipped.
+        Line coordinates are in mm, pixel_size is the size of an img pixel in mm.
+        """
+        lines = lines[(lines >= 0).all(axis=1)]
+        pixel = 1/pixel_size
+        _draw_lines(img, (lines * pixel).astype(np.int64), gray)
+
+    def get_delta_chain(self, line_chain: LineSegmentChain, offset: float) -> LineSegmentChain:
+        """
+        Return (cached) delta chain of line_chain, see LineSegmentChain.delta_chain.
+        """
+        key = (id(line_chain), offset)
+        if key not in self._delta_chains:
+            segments = line_chain.segments()
+            origin = segments[0,[0,1,0,1]]
+            # (adding 0.0 turns -0.0 into 0.0)
+            shape = np.round(segments - origin, 9) + 0.0
+            shape_key = (shape.tobytes(), offset)
+            if shape_key in self._shape_delta_chains:
+                self._shape_delta_chains.move_to_end(shape_key)
+                shape_origin, delta_segments = self._shape_delta_chains[shape_key]
+                self._delta_chains[key] = LineSegmentChain.from_segments(delta_segments + (origin - shape_origin))
+            else:
+                self._delta_chains[key] = LineSegmentChain.delta_chain(line_chain, offset)
+                self._shape_delta_chains[shape_key] = (origin, self._delta_chains[key].segments())
+                if len(self._shape_delta_chains) > SHAPE_CACHE_SIZE:
+                    self._shape_delta_chains.popitem(last=False)
+        return self._delta_chains[key]
+
+    def fill_path(self, name_id: str, line_chains: list[LineSegmentChain], steps: list[float], fill_color: int,
+                  boundingbox: Boundingbox):
+        """
+        Fill a path (svg 'fill' attribute, fill rule 'evenodd').
+        The gcode is added to the image gcode.
+
+        :param name_id: name of the path.
+        :param line_chains: line chains of the path, or their line segments (see LineSegmentChain.segments).
+        :param steps: offsets of the stroke lines of the path (to erase the fill overlap with the stroke).
+        :param fill_color: fill (pixel) value.
+        :param boundingbox: boundingbox of the path stroke, updated with the path border.
+        """
+        line_chains = [LineSegmentChain.from_segments(line_chain) if isinstance(line_chain, np.ndarray) else line_chain
+                                                                    for line_chain in line_chains]
+
+        # fill a path
+        # this is done in 6 steps:
+        # step 1: create two raster images matching the bbox
+        # step 2: add marker lines just inside the line chains of the path
+        # step 3: scan the marker image lines and apply 'evenodd' fill
+        #         (fill rule 'nonzero' to be implemented later on see note below)
+        # step 4: draw white borders to erase fill overlap
+        # step 5: filter stray pixels (to remove noise from the action above)
+        # step 6: generate gcode from image_fill (by execution function image2gcode)
+        # When setting 'direct_fill_gcode' is set, gcode is emitted for the fill lines found in step 3 and
+        # steps 4, 5 and 6 are left out (see note step 3).
+
+        pixel_size = float(self.settings["pixel_size"])
+        direct_fill = self.settings["direct_fill_gcode"]
+
+        # make half steps to 'completely' erase the overlap with the stroke (step 4)
+        # (or for direct gcode: to draw the border in full stroke width, step 2)
+        halfsteps = list(steps)
+        for step in steps:
+            if step:
+                sign = -1 if step >= 0 else 1
+                halfsteps.append(round(step + sign * pixel_size/2, self.precision))
+
+        # update boundingbox for this 'name_id'
+        for line_chain in line_chains:
+            points = line_chain.segments().reshape(-1, 2)
+            boundingbox.update(points.min(axis=0).tolist())
+            boundingbox.update(points.max(axis=0).tolist())
+
+        # get bounding box info from the path border
+        lowerleft = boundingbox.get()[0]
+        upperright = boundingbox.get()[1]
+
+        # normalize origin to (0.0)
+        dXY = (-lowerleft.x, -lowerleft.y)
+        dXYXY = np.array(dXY * 2)
+
+        # get raster image dimensions
+        img_height = math.ceil((upperright.y - lowerleft.y)/pixel_size)
+        img_width = math.ceil((upperright.x - lowerleft.x)/pixel_size)
+
+        # default scan error (step 3 below)
+        scan_error = 4
+
+        # step 1: create two raster images matching the bbox
+        # (two planes of one contiguous buffer, steps 2 to 4 work on both images)
+        # (direct gcode: only the marker image is needed)
+        # The buffer is reused by all fills, it only grows when a fill needs more.
+        # init
+        planes_shape = (1 if direct_fill else 2, img_height + 4, img_width + scan_error + 2)
+        if self._fill_buffer.size < math.prod(planes_shape):
+            self._fill_buffer = np.empty(math.prod(planes_shape), dtype=np.uint8)
+        planes = self._fill_buffer[:math.prod(planes_shape)].reshape(planes_shape)
+        image_mark = planes[0]
+        image_mark.fill(255)
+        if not direct_fill:
+            image_fill = planes[1]
+            image_fill.fill(0)
+
+        # step 2: add marker lines just inside the line chains of the path
+        # - determine the inside of the line chain
+        # - draw marker lines
+        for line_chain in line_chains:
+            # Note that a svg object with a specific name_id can have multiple line_chains that
+            # together, define one shape (circumference). When this the case the
+            # inside/outside method below is not fullproof. This can be solved to stitch together
+            # the line chain parts (TODO)
+
+            # - determine the inside of the line chain
+            # A positive delta offset is 'outside' the line chain when it is drawn clockwise
+            # (see LineSegmentChain.delta_chain), so the rotation of the line chain tells us
+            # on which side the inside is.
+            # Note that we can use the rotation to implement the other svg fill rule: 'nonzero'.
+            inside = -1 if LineSegmentChain.clockwise(line_chain) else 1
+
+            # get line chain bbox size
+            points = line_chain.segments().reshape(-1, 2) + dXY
+            bbox_size = float(np.prod(points.max(axis=0) - points.min(axis=0)))
+
+            # Note that some tuning is going on here.
+            # This can be remedied in several ways:
+            # - use draw lines that have a thickness?
+            # - use a higher resolution (pixel grid) to reduce the 'rounding' errors
+            offsets = [inside * .5 * pixel_size, inside * pixel_size, inside * 1.5 * pixel_size, inside * 2 * pixel_size]
+            # Note that the system sometimes returns line_chains having 1 point and thus having no size, this is 'solved'
+            # below, but should not happen (TODO). It is also assumed that line_chain parts that define one shape have
+            # similar sizes (TODO).
+            if bbox_size > 0 and bbox_size < 6:
+                # small area, less margin for error
+                scan_error = 1
+                del offsets[-2:]
+
+            if direct_fill and halfsteps:
+                # the border is as wide as the stroke, move the inside marker lines along
+                border_width = max(abs(step) for step in halfsteps)
+                offsets = [offset + inside * border_width for offset in offsets]
+
+            # draw border lines of a specific marker color within line chain
+            # Note that the marker values are just a choice and only have to be consistent
+            # with the algorithm used (step 3)
+            if bbox_size > 0.0:
+                for offset in offsets:
+                    # make a line chain just one pixel inside the base (step 0) line chain
+                    delta_chain = self.get_delta_chain(line_chain, offset)
+                    self.draw_lines(image_mark, delta_chain.segments() + dXYXY, 128, pixel_size)
+
+            # draw the line chain border using another marker color
+            # (direct gcode: draw the border in full stroke width)
+            border_steps = halfsteps if direct_fill and halfsteps else [0]
+            border_lines = [(self.get_delta_chain(line_chain, step) if step else line_chain).segments() for step in border_steps]
+            self.draw_lines(image_mark, np.concatenate(border_lines) + dXYXY, 10, pixel_size)
+
+        # step 3: scan the marker image lines and and apply 'evenodd' fill
+        #         (fill rule 'nonzero' to be implemented later on)
+        #    for each line (y):
+        #        for each point (x) on the line:
+        #           scan from left to right or reverse:
+        #               for markers (border,inside border) and apply rule
+        #               'evenodd' to fill when an even number of borders
+        #               is crossed, untill odd
+        # Note that image 'image_fill' is filled (not 'image_mark') to make sure marks stay in place.
+
+        # Note that the fill algorithm supports direct rendering of gcode (instead of rendering via 'image_fill' and
+        # function 'image2gcode', converting a raster image to gcode). This reduces the number of steps needed: steps 4, 5 and 6 are
+        # left out. It does need a few adaptations in the previous steps, namely drawing the line chain border (color '10') in full
+        # stroke width (instead of 1 pixel) and drawing the 'inside' lines (color 128) just inside of that. The border pixels are
+        # skipped when the fill lines are emitted.
+
+        # get the fill spans (x start, x end, y) in pixels
+        spans = _scan_evenodd(image_mark, scan_error)
+
+        if direct_fill:
+            # emit gcode for the fill spans (skip steps 4, 5 and 6)
+            self.fill_spans2gcode(name_id, spans, image_mark, (-dXY[0], -dXY[1]), fill_color, len(halfsteps) > 0)
+            return
+
+        # draw the fill spans
+        if spans:
+            self.draw_lines(image_fill, np.array(spans)[:,[0,2,1,2]] * pixel_size, fill_color, pixel_size)
+
+        # Steps 4 and 5 are only needed when the path has a stroke (there is no overlap to erase otherwise).
+        if halfsteps:
+            # step 4: draw white borders to erase fill overlap
+            # (collect the border lines of all line chains and half steps, draw them at once)
+            erase_lines = [(self.get_delta_chain(line_chain, step) if step else line_chain).segments()
+                                for line_chain in line_chains for step in halfsteps]
+            self.draw_lines(image_fill, np.concatenate(erase_lines) + dXYXY, 0, pixel_size)
+
+            # step 5: filter stray pixels (to remove noise from the action above)
+            # erase set pixels (not too close to the image border) whose four neighbours are all unset
+            # (note that erasing an isolated pixel cannot isolate another one, so this is done in one pass)
+            nonzero = image_fill != 0
+            isolated = (nonzero[2:-1,2:-1] & ~nonzero[2:-1,3:] & ~nonzero[2:-1,1:-2]
+                                           & ~nonzero[3:,2:-1] & ~nonzero[1:-2,2:-1])
+            image_fill[2:-1,2:-1][isolated] = 0
+
+        # step 6: generate gcode from image_fill
+        img_attrib = {}
+        img_attrib['id'] = name_id
+        # Set speedmove to a short distance to be able to view it correctly using a viewer like LaserWeb.
+        # (image2gcode converts movements without writing to 'G1 S0' gcodes which viewers show in a specific
+        #  writing color, speedmoves uses gcode G0 to move without writing which viewers show in another color)
+        #img_attrib['gcode_speedmoves'] = 0.1
+        img_attrib['x'] = -dXY[0]
+        img_attrib['y'] = -dXY[1]
+        img_attrib['invert'] = False
+
+        # start gcode fill
+        self.image2gcode(img_attrib, image_fill)
+
     def parse_style_attribute(self, curve: Curve) -> {}:
         """
         Parse style attribute.
         for example "fill:#F4CF84;fill-rule:evenodd;stroke:#D07735;"
+        Note that the result is cached per path attribute dict, so it must not be modified.
         """
 
+        # curves (line segments) of one path share the same attribute dict, parse it once
+        cache_key = id(curve.path_attrib)
+        cached = self._style_cache.get(cache_key)
+        if cached is not None:
+            return cached[1]
+
         style = {'fill' : None, 'fill-rule': None, 'fill-opacity': None, 'stroke': None, 'stroke-width': None, 'stroke-opacity': None, 'pathcut': None}
 
         # parse style attribute
 
-        if curve.path_attrib and 'style' in curve.path_attrib:
-            style_str = curve.path_attrib['style']
+        path_attrib = curve.path_attrib
+        if path_attrib and 'style' in path_attrib:
+            style_str = path_attrib['style']
 
             # parse fill
-            if 'fill' in style_str:
-                fill = re.search('fill:[^;]+;',style_str)
-                if fill:
-                    fill_str = fill.group(0)[5:-1]
-                    if fill_str != 'none':
-                        style['fill'] = fill_str
+            fill = _STYLE_FILL.search(style_str)
+            if fill and fill.group(1) != 'none':
+                style['fill'] = fill.group(1)
             # parse fill-rule
-            if 'fill-rule' in style_str:
-                fill_rule = re.search('fill-rule:#(evenodd|nonzero)',style_str)
-                if fill_rule:
-                    style['fill-rule'] = re.search('(evenodd|nonzero)', fill_rule.group(0)).group(0)
+            fill_rule = _STYLE_FILL_RULE.search(style_str)
+            if fill_rule:
+                style['fill-rule'] = fill_rule.group(1)
             # parse fill-opacity
-            if 'fill-opacity' in style_str:
-                fill_opacity = re.search('fill-opacity:(\d*\.)?\d+',style_str)
-                if fill_opacity:
-                    style['fill-opacity'] = re.search('(\d*\.)?\d+', fill_opacity.group(0)).group(0)
+            fill_opacity = _STYLE_FILL_OPACITY.search(style_str)
+            if fill_opacity:
+                style['fill-opacity'] = fill_opacity.group(1)
             # parse stroke
-            if 'stroke' in style_str:
-                stroke = re.search('stroke:[^;]+;',style_str)
-                if stroke:
-                    stroke_str = stroke.group(0)[7:-1]
-                    if stroke_str != 'none':
-                        style['stroke'] = stroke_str
+            stroke = _STYLE_STROKE.search(style_str)
+            if stroke and stroke.group(1) != 'none':
+                style['stroke'] = stroke.group(1)
             # parse stroke-width
-            if 'stroke-width' in style_str:
-                stroke_width = re.search('stroke-width:(\d*\.)?\d+',style_str)
-                if stroke_width:
-                    style['stroke-width'] = re.search('(\d*\.)?\d+', stroke_width.group(0)).group(0)
+            stroke_width = _STYLE_STROKE_WIDTH.search(style_str)
+            if stroke_width:
+                style['stroke-width'] = stroke_width.group(1)
             # parse stroke-opacity
-            if 'stroke-opacity' in style_str:
-                stroke_opacity = re.search('stroke-opacity:(\d*\.)?\d+',style_str)
-                if stroke_opacity:
-                    style['stroke-opacity'] = re.search('(\d*\.)?\d+', stroke_opacity.group(0)).group(0)
+            stroke_opacity = _STYLE_STROKE_OPACITY.search(style_str)
+            if stroke_opacity:
+                style['stroke-opacity'] = stroke_opacity.group(1)
 
             # parse pathcut
-            if 'gcode-pathcut' in style_str:
-                pathcut = re.search('gcode-pathcut:(true|false)',style_str)
-                if pathcut:
-                    style['pathcut'] = re.search('(true|false)', pathcut.group(0)).group(0)
+            pathcut = _STYLE_PATHCUT.search(style_str)
+            if pathcut:
+                style['pathcut'] = pathcut.group(1)
 
         # parse other attributes
 
         # parse fill attribute
-        if 'fill' in curve.path_attrib:
-            if curve.path_attrib['fill'] != 'none':
-                style['fill'] = curve.path_attrib['fill']
-        if 'fill-rule' in curve.path_attrib:
-            style['fill-rule'] = curve.path_attrib['fill-rule']
+        if 'fill' in path_attrib:
+            if path_attrib['fill'] != 'none':
+                style['fill'] = path_attrib['fill']
+        if 'fill-rule' in path_attrib:
+            style['fill-rule'] = path_attrib['fill-rule']
         # parse fill-opacity
-        if 'fill-opacity' in curve.path_attrib:
-            fill_opacity = re.search('fill-opacity:(\d*\.)?\d+',curve.path_attrib)
+        if 'fill-opacity' in path_attrib:
+            fill_opacity = _NUMBER.search(path_attrib['fill-opacity'])
             if fill_opacity:
-                style['fill-opacity'] = re.search('(\d*\.)?\d+', fill_opacity.group(0)).group(0)
+                style['fill-opacity'] = fill_opacity.group(0)
         # parse stroke attribute
-        if 'stroke' in curve.path_attrib:
-            stroke_str = curve.path_attrib['stroke']
+        if 'stroke' in path_attrib:
+            stroke_str = path_attrib['stroke']
             if stroke_str != 'none':
                 style['stroke'] = stroke_str
         # parse stroke-width attribute
-        if 'stroke-width' in curve.path_attrib:
-            style['stroke-width'] = curve.path_attrib['stroke-width']
+        if 'stroke-width' in path_attrib:
+            style['stroke-width'] = path_attrib['stroke-width']
         # parse stroke-opacity attribute
-        if 'stroke-opacity' in curve.path_attrib:
-            style['stroke-opacity'] = curve.path_attrib['stroke-opacity']
+        if 'stroke-opacity' in path_attrib:
+            style['stroke-opacity'] = path_attrib['stroke-opacity']
 
         # parse gcode_pathcut attribute
-        if 'gcode_pathcut' in curve.path_attrib:
-            style['pathcut'] = curve.path_attrib['gcode_pathcut']
+        if 'gcode_pathcut' in path_attrib:
+            style['pathcut'] = path_attrib['gcode_pathcut']
 
         # check missing attributes, if any
-        if ElementTreeParent in curve.path_attrib:
-            parent = curve.path_attrib[ElementTreeParent]
+        if ElementTreeParent in path_attrib:
+            parent = path_attrib[ElementTreeParent]
 
             # find first parent <g (group) tag, if any
             while parent and parent.tag != "{%s}g" % NAMESPACES["svg"]:
@@ -501,6 +976,10 @@ class Compiler:
                             attrib = parent.attrib[key]
                             if attrib and attrib != 'none':
                                 style[key] = attrib
+
+        # keep a reference to the attribute dict, so its id cannot be reused while cached
+        self._style_cache[cache_key] = (path_attrib, style)
+
         return style
 
     def color_coded_paths(self, set_color_coded = False) -> ():
@@ -589,84 +1068,35 @@ class Compiler:
         Draws curves.
         """
 
-        def line_slope(p1: (int,int), p2: (int,int)):
-            """Calculate the slope of the line p1p2"""
-            x1, y1 = p1[0], p1[1]
-            x2, y2 = p2[0], p2[1]
-
-            if x1 == x2:
-                return 1
-
-            return (y1 - y2) / (x1 - x2)
-
-        def line_offset(p1: (int,int), p2: (int,int)):
-            """Calculate the offset of the line p1p2 from the origin"""
-            x1, y1 = p1[0], p1[1]
-
-            return y1 - line_slope(p1, p2) * x1
-
-        def lline(x, slope, offset):
-            y = slope * x + offset
-            return round(y)
-
-        def draw(img, start: (int,int), end: (int,int), color):
-            """
-            Draws a line from - and including - start (x,y) to - and including - end (x,y).
-            """
-            slope = line_slope(start, end)
-            offset = line_offset(start, end)
-
-            if slope == 1 and ((start[0] - end[0]) != (start[1] - end[1])):
-                # vertical line (not a 45 degrees line)
-                diy = 1 if end[1] > start[1] else -1
-                for y2 in range(start[1], end[1] + diy, diy):
-                    img[y2,start[0]] = color
-            else:
-                # non vertical line
-                dix = 1 if end[0] > start[0] else -1
-                prev = start
-                for x in range(start[0], end[0] + dix, dix):
-                    y = lline(x,slope,offset)
-                    if abs(y - prev[1]) > 1:
-                        di = 1 if y > prev[1] else -1
-                        for y1 in range(prev[1] + di, y, di):
-                            img[y1,x] = color
-
-                    img[y,x] = color
-                    prev = (x,y)
-
-        def draw_line(img: np.array, p1: (int,int), p2: (int,int), gray: int):
-            """
-            Draws a line from - and including - p1 (x,y) to -and including p2 (x,y).
-            """
-            if not ((p1[0] < 0) or (p1[1] < 0) or (p2[0] < 0) or( p2[1] < 0)):
-                pixel = 1/self.settings["pixel_size"]
-                draw(img, (int(p1[0]*pixel),int(p1[1]*pixel)),(int(p2[0]*pixel),int(p2[1]*pixel)), gray)
-
         def render_pathwidth(line_chain: LineSegmentChain, steps: list[float], color: int = None, speed: int = None, boundingbox = None):
             """
             Render - generate gcode for - a path of certain 'width'.
             """
+            def update_boundingbox(chain: LineSegmentChain):
+                """
+                Update the boundingbox of this 'name_id' with the extremes of chain (instead of point by point).
+                """
+                if chain.chain_size() > 0:
+                    points = chain.segments().reshape(-1, 2)
+                    boundingbox.update(points.min(axis=0).tolist())
+                    boundingbox.update(points.max(axis=0).tolist())
+
             # A path can be an 'engraving' or a 'cut'.
             for step in steps:      # step 'width'
                 if step:
                     # calculate delta chain
-                    delta_chain = LineSegmentChain.delta_chain(line_chain, step)
+                    delta_chain = self.get_delta_chain(line_chain, step)
 
                     # Note that append_line_chain generates a path cut when inverse_bw and speed are set to None.
                     self.append_line_chain(delta_chain, step, color, speed)
 
                     # update boundingbox of this 'name_id'
-                    for line in delta_chain:
-                        boundingbox.update(line.start)
-                        boundingbox.update(line.end)
+                    update_boundingbox(delta_chain)
                 else:
                     # Note that append_line_chain generates a path cut when inverse_bw and speed are set to None.
                     self.append_line_chain(line_chain, 0, color, speed)
                     # update boundingbox of this 'name_id'
-                    for line in line_chain:
-                        boundingbox.update(line.start)
-                        boundingbox.update(line.end)
+                    update_boundingbox(line_chain)
 
         def get_style_info_of_line_chain(line_chain: LineSegmentChain) -> ():
             """
@@ -692,9 +1122,17 @@ class Compiler:
                         stroke_alpha = float(style['stroke-opacity'])
                         if not (stroke_alpha >=0 and stroke_alpha <= 1):
                             logger.warn(f"Opacity value '{stroke_alpha}' should be in range [0.0..1.0]!")
+                    elif stroke_color:
+                        # Get stroke alpha channel (opacity) from the rgba property, when available
+                        stroke_alpha = 1
+                        rgba = css_color.parse_css_color(stroke_color)
+                        if len(rgba) == 4:
+                            stroke_alpha = rgba[3]
                 if style['stroke-width'] is not None and style['stroke-width'] != "none":
                     width = float(style['stroke-width'])
-                    stroke_width = math.ceil(round(width/pixel_size, self.precision)/2)
+                    # half the width in pixels, rounded up (width in pixels is rounded to 'precision' digits first,
+                    # in integer units of 10**-precision pixel)
+                    stroke_width = -(-round(width/pixel_size * precision_scale) // (2 * precision_scale))
                 if style['fill'] is not None and style['fill'] != 'none':
                     # Invert b&w value and apply alpha channel - when available - to the inverted b&w value
                     # Library function image2gcode - as it is now - cannot invert a color value and then apply the alpha channel.
@@ -724,18 +1162,27 @@ class Compiler:
 
 
         path_curves = {}
+        images = []
+
+        # settings used per line chain
         pixel_size = float(self.settings["pixel_size"])
+        precision_scale = 10 ** self.precision
+        cut_all_paths = self.settings["pathcut"]
+        maximum_image_laser_power = self.settings["maximum_image_laser_power"]
+        image_movement_speed = self.settings["image_movement_speed"]
+        color_coded = self.settings["color_coded"]
+        nofill = self.settings["nofill"]
 
-        for curve in curves:
-            if isinstance(curve, RasterImage):
-                # curve is 'image', draw it
+        # line chains by path and end point (to stitch chains, see below)
+        chain_ends: dict[tuple[int, int, int], LineSegmentChain] = {}
 
-                # convert image (scale and type)
-                img = self.convert_image(curve.image, curve.img_attrib)
+        def chain_end_key(curve: Curve, point: Vector) -> tuple[int, int, int]:
+            return (id(curve.path_attrib), round(point.x / TOLERANCES["operation"]), round(point.y / TOLERANCES["operation"]))
 
-                if img is not None:
-                    # Draw image by converting raster image scan lines to gcode, possibly applying tranformations on each pixel
-                    self.image2gcode(curve.img_attrib, img, curve.transformation)
+        for curve in curves:
+            if isinstance(curve, RasterImage):
+                # curve is 'image', draw it (see below)
+                images.append(curve)
             else:
                 # curve is a 'path', approximate it (when needed) as line segments.
                 # organize curves by 'name_id' to be able to apply fill/stroke color and
@@ -749,20 +1196,59 @@ class Compiler:
                 if curve_name_id not in path_curves:
                     path_curves[curve_name_id] = []
 
-                line_chain = LineSegmentChain()
-                # approximate curve
-                approximation = LineSegmentChain.line_segment_approximation(curve)
-                line_chain.extend(approximation)
+                # approximate curve (as a new line chain)
+                line_chain = LineSegmentChain.line_segment_approximation(curve)
 
-                # stitch chains when the next chain starts at the end of the previous chain
-                if len(path_curves[curve_name_id]) and path_curves[curve_name_id][-1].get(-1).end == line_chain.get(0).start:
-                    path_curves[curve_name_id][-1].extend(line_chain)
+                # stitch chains when the next chain starts at the end of a chain of the same path
+                # (chains are found by path and end point, rounded to the operation tolerance)
+                chain = chain_ends.pop(chain_end_key(curve, line_chain.get(0).start), None)
+                if chain is not None:
+                    chain.extend(line_chain)
                 else:
                     # add line segments to curves having this id
+                    chain = line_chain
                     path_curves[curve_name_id].append(line_chain)
-
-        # emit all paths (organized by name id)
-        for name_id in path_curves:
+                chain_ends[chain_end_key(curve, chain.get(-1).end)] = chain
+
+        # style info by path attributes: line chains of one svg path share them, so get the style info once per path
+        # (note that line chains without 'id' end up in the same 'name_id', these can be from different paths)
+        style_infos = {}
+        for line_chains in path_curves.values():
+            for line_chain in line_chains:
+                path_attrib_id = id(line_chain.get(0).path_attrib)
+                if path_attrib_id not in style_infos:
+                    style_infos[path_attrib_id] = get_style_info_of_line_chain(line_chain)
+
+        # Images and fills do not depend on each other nor on the strokes (which depend on the state of the interface),
+        # so these are converted by worker processes when there are enough of them and multiple cpus are available
+        # (setting 'parallel'). Their gcode is added in order: images first, then the fills (the fill color of a
+        # 'name_id' is the one of its last line chain, see below).
+        # A single image is converted by this process (while the workers convert the fills): sending it to a worker
+        # only adds copying the image data and its gcode.
+        fills = 0 if nofill else sum(1 for line_chains in path_curves.values()
+                                        if line_chains and style_infos[id(line_chains[-1].get(0).path_attrib)][3] is not None)
+        worker_images = images if len(images) > 1 else []
+        processes = 1
+        if self.settings["parallel"] and len(worker_images) + fills >= PARALLEL_MIN_JOBS:
+            processes = min(available_cpus(), len(worker_images) + fills)
+        if processes == 1:
+            worker_images = []
+        local_images = [] if worker_images else images
+        # (method and arguments of the jobs for the worker processes)
+        jobs = []
+
+        for image in worker_images:
+            # (leave out the reference to the parent element, a worker does not need the svg tree)
+            img_attrib = {key: value for key, value in image.img_attrib.items() if key != ElementTreeParent}
+            jobs.append(('append_image', (image.image, img_attrib, image.transformation)))
+        if processes == 1:
+            for image in local_images:
+                self.append_image(image.image, image.img_attrib, image.transformation)
+
+        # emit all paths (organized by name id), in document order or nearest neighbor order
+        name_ids = self.nearest_path_order(path_curves) if self.settings["optimize_path_order"] else list(path_curves)
+        for name_id in name_ids:
+            self._delta_chains.clear()
 
             steps = []
             fill_color = None
@@ -775,31 +1261,24 @@ class Compiler:
             # Render svg 'stroke' attribute
             for line_chain in path_curves[name_id]:
                 # get style info
-                stroke_width, stroke_color, stroke_alpha, fill_color, fill_alpha, fill_rule, style_pathcut = get_style_info_of_line_chain(line_chain)
+                stroke_width, stroke_color, stroke_alpha, fill_color, fill_alpha, fill_rule, style_pathcut = \
+                                                                            style_infos[id(line_chain.get(0).path_attrib)]
 
-                if (style_pathcut is not None and style_pathcut == 'true') or self.settings["pathcut"]:
+                if (style_pathcut is not None and style_pathcut == 'true') or cut_all_paths:
                     # cut path
-                    self.body.extend([f"\n; cut path (pathcut set) '{name_id}'"])
+                    self.body.append(f"\n; cut path (pathcut set) '{name_id}'")
                     render_pathwidth(line_chain, [0], None, None, boundingbox)
                 elif len(stroke_color):
 
-                    # Get stroke alpha channel (opacity)
-                    # fill opacity attribute overrides rgba property
-                    if stroke_alpha is None:
-                        stroke_alpha = 1
-                        rgba = css_color.parse_css_color(stroke_color)
-                        if len(rgba) == 4:
-                            stroke_alpha = rgba[3]
-
                     # engrave values
                     # set inversed b&w value (and apply alpha channel, when available)
                     inverse_bw = round(Image2gcode.linear_power(css_color.parse_css_color2bw8(stroke_color),
-                                                          self.settings["maximum_image_laser_power"]) * stroke_alpha)
+                                                          maximum_image_laser_power) * stroke_alpha)
                     # set laser head movement speed
-                    speed = self.settings["image_movement_speed"]
+                    speed = image_movement_speed
 
                     # handle option color_coded
-                    if self.settings["color_coded"]:
+                    if color_coded:
                         # get color_coded info
                         ignorepath, cutpath, engravepath = self.parse_color_coded(stroke_color)
 
@@ -807,7 +1286,7 @@ class Compiler:
 
                             if cutpath:
                                 # color_coded set cut path for this stroke_color
-                                self.body.extend([f"\n; --color_coded cut path '{name_id}', color '{stroke_color}'"])
+                                self.body.append(f"\n; --color_coded cut path '{name_id}', color '{stroke_color}'")
                                 render_pathwidth(line_chain, [0], None, None, boundingbox)
                             elif inverse_bw:
                                 # with path color, setengrave path ...
@@ -825,13 +1304,13 @@ class Compiler:
                                                     steps.append(round(-delta * pixel_size, self.precision))
 
                                     if len(pathengrave) == 0:
-                                        self.body.extend([f"\n; --color_coded: engrave not set, path '{name_id}', color '{stroke_color}'"])
+                                        self.body.append(f"\n; --color_coded: engrave not set, path '{name_id}', color '{stroke_color}'")
                                     else:
-                                        self.body.extend([f"\n; --color_coded: engrave path '{name_id}', color '{stroke_color}'"])
+                                        self.body.append(f"\n; --color_coded: engrave path '{name_id}', color '{stroke_color}'")
                                     render_pathwidth(line_chain, steps, inverse_bw, speed, boundingbox)
                         else:
                             # ignore path
-                            self.body.extend([f"\n; --color_coded: ignore path '{name_id}', color '{stroke_color}'"])
+                            self.body.append(f"\n; --color_coded: ignore path '{name_id}', color '{stroke_color}'")
 
                     elif inverse_bw:
                         # Get steps (offsets) for the lines that make the border
@@ -844,284 +1323,74 @@ class Compiler:
                                         steps.append(round(-delta * pixel_size, self.precision))
 
                         # color_coded isn't set: engrave path with stroke color
-                        self.body.extend([f"\n; default action: engrave path '{name_id}', color '{stroke_color}'"])
+                        self.body.append(f"\n; default action: engrave path '{name_id}', color '{stroke_color}'")
                         render_pathwidth(line_chain, steps, inverse_bw, speed, boundingbox)
                 else:
                     # cannot engrave path (ignore)
-                    self.body.extend([f"\n; cannot engrave path (ignore) no stroke color set: path '{name_id}'"])
+                    self.body.append(f"\n; cannot engrave path (ignore) no stroke color set: path '{name_id}'")
 
             # Render svg 'fill' attribute
-            #if not self.settings["nofill"] and fill_color is not None and boundingbox.get() is not None:
-            if not self.settings["nofill"] and fill_color is not None:
-                # fill a path
-                # this is done in 6 steps:
-                # step 1: create two raster images matching the bbox
-                # step 2: add marker lines just inside the line chains of the path
-                # step 3: scan the marker image lines and apply 'evenodd' fill
-                #         (fill rule 'nonzero' to be implemented later on see note below)
-                # step 4: draw white borders to erase fill overlap
-                # step 5: filter stray pixels (to remove noise from the action above)
-                # step 6: generate gcode from image_fill (by execution function image2gcode)
-
-                # update boundingbox for this 'name_id'
-                for line_chain in path_curves[name_id]:
-                    for line in line_chain:
-                        boundingbox.update(line.start)
-                        boundingbox.update(line.end)
-
-                # get bounding box info from the path border
-                lowerleft = boundingbox.get()[0]
-                upperright = boundingbox.get()[1]
-
-                # normalize origin to (0.0)
-                vdXY = Vector(-lowerleft.x, -lowerleft.y)
-                dXY = (-lowerleft.x, -lowerleft.y)
-
-                # get raster image dimensions
-                img_height = math.ceil((upperright.y - lowerleft.y)/pixel_size)
-                img_width = math.ceil((upperright.x - lowerleft.x)/pixel_size)
-
-                # default scan error (step 3 below)
-                scan_error = 4
-
-                # step 1: create two raster images matching the bbox
-                # init
-                image_mark = np.full([img_height + 4, img_width + scan_error + 2], 255, dtype=np.uint8)
-                image_fill = np.full([img_height + 4, img_width + scan_error + 2], 0, dtype=np.uint8)
-
-                # step 2: add marker lines just inside the line chains of the path
-                # - determine the inside of the line chain
-                # - draw marker lines
-                for line_chain in path_curves[name_id]:
-                    # Note that a svg object with a specific name_id can have multiple line_chains that
-                    # together, define one shape (circumference). When this the case the boundingbox
-                    # inside/outside method below is not fullproof. This can be solved to stitch together
-                    # the line chain parts (TODO)
-
-                    # - determine the inside of the line chain
-                    # Compare the bbox of the line chain with that of a delta line chain a
-                    # fixed distance (offset) from the base line chain. Initially we do not know if the
-                    # delta line chain is inside or outside the base line chain, but when we compare
-                    # the bbox sizes we know.
-                    # Note that this method can be used to determine if a line chain is drawn clockwise
-                    # or anti-clockwise because a positive delta offset should be 'outside' the line chain
-                    # in this case (depending on the definition/calculation of the delta function).
-                    # we can use this to implement the other svg fill rule: 'nonzero'.
-                    bbox = Boundingbox()
-                    for line in line_chain:
-                        bbox.update(line.start + vdXY)
-                        bbox.update(line.end + vdXY)
-                    bbox_size = bbox.size()
-
-                    bbox = Boundingbox()
-                    delta_chain = LineSegmentChain.delta_chain(line_chain, pixel_size * 2)
-                    for line in delta_chain:
-                        bbox.update(line.start + vdXY)
-                        bbox.update(line.end + vdXY)
-                    bbox_deltasize =  bbox.size()
-
-                    # compare bboxes and set inside offset
-                    inside = 1
-                    if bbox_deltasize > bbox_size:
-                        inside = -1
-
-                    # Note that some tuning is going on here.
-                    # This can be remedied in several ways:
-                    # - use draw lines that have a thickness?
-                    # - use a higher resolution (pixel grid) to reduce the 'rounding' errors
-                    offsets = [inside * .5 * pixel_size, inside * pixel_size, inside * 1.5 * pixel_size, inside * 2 * pixel_size]
-                    # Note that the system sometimes returns line_chains having 1 point and thus having no size, this is 'solved'
-                    # below, but should not happen (TODO). It is also assumed that line_chain parts that define one shape have
-                    # similar sizes (TODO).
-                    if bbox_size > 0 and bbox_size < 6:
-                        # small area, less margin for error
-                        scan_error = 1
-                        del offsets[-2:]
-
-                    ## direct gcode: update this, see note step 3
-                    # draw border lines of a specific marker color within line chain
-                    # Note that the marker values are just a choice and only have to be consistent
-                    # with the algorithm used (step 3)
-                    if bbox_size > 0.0:
-                        for offset in offsets:
-                            # make a line chain just one pixel inside the base (step 0) line chain
-                            delta_chain = LineSegmentChain.delta_chain(line_chain, offset)
-                            for line in delta_chain:
-                                draw_line(image_mark, line.start + vdXY, line.end + vdXY, 128)
-
-                    # draw the line chain border using another marker color
-                    for line in line_chain:
-                        draw_line(image_mark, line.start + vdXY, line.end + vdXY, 10)
-
-                # step 3: scan the marker image lines and and apply 'evenodd' fill
-                #         (fill rule 'nonzero' to be implemented later on)
-                #    for each line (y):
-                #        for each point (x) on the line:
-                #           scan from left to right or reverse:
-                #               for markers (border,inside border) and apply rule
-                #               'evenodd' to fill when an even number of borders
-                #               is crossed, untill odd
-                # Note that image 'image_fill' is filled (not 'image_mark') to make sure marks stay in place.
-
-                # Note that the fill algorithm can be adapted to support direct rendering of gcode (instead of rendering via 'image_fill' and
-                # function 'image2gcode', converting a raster image to gcode). This reduces the number of steps needed: steps 4, 5 and 6 can
-                # be left out. It does need a few adaptations in the previous steps, namely drawing the line chain border (color '10') in full width
-                # (instead of 1 pixel) and draw the 'inside' line (color 128) one pixel further. In addition to this uncomment the '## direct gcode'
-                # lines of step 3 to activate gcode rendering.
-
-                ## direct gcode
-                ## code = [f"\n; fill '{name_id}'"]
-                ## code += [self.interface.set_laser_power_value(Image2gcode.linear_power(fill_color, self.settings["maximum_image_laser_power"]))]
-
-                go_right = True
-                # start scanning to the right
-                for y in range(image_mark.shape[0]):
-                    evenodd = 0
-
-                    if go_right:
-                        # scan to the right
-                        x = 0
-                        start = None
-                        while x < image_mark.shape[1]:
-                            if image_mark[y,x] == 10 :
-                                # found a border
-                                x_b = x
-                                ## direct gcode
-                                ## update line below, to be able to skip empty (value 255) pixels
-                                # scan border, possibly having multiple pixels.
-                                while x_b < image_mark.shape[1] and image_mark[y,x_b] == 10:
-                                    x_b += 1
-
-                                xscan_b = x - 1
-                                while xscan_b > 0 and xscan_b > (x - scan_error) and (image_mark[y,xscan_b] != 10 and image_mark[y,xscan_b] != 128):
-                                    xscan_b -= 1
-                                xscan_a = x_b
-                                while xscan_a < image_mark.shape[1] and xscan_a < (x_b + scan_error) and (image_mark[y,xscan_a] != 10 and image_mark[y,xscan_a] != 128):
-                                    xscan_a += 1
-
-                                if xscan_b >= 0 and image_mark[y,xscan_b] == 128:
-                                    # found border
-                                    if evenodd % 2 == 0:
-                                        start = (x * pixel_size, y * pixel_size)
-                                        ## direct gcode
-                                        ## code += [self.interface.rapid_move(start[0] - dXY[0], start[1] - dXY[1])]
-                                    else:
-                                        draw_line(image_fill, start + dXY, (x * pixel_size, y * pixel_size) + dXY, fill_color)
-                                        ## direct gcode
-                                        ## code += [self.interface.linear_move(x * pixel_size - dXY[0], y * pixel_size - dXY[1])]
-                                    evenodd = evenodd + 1
-                                if xscan_a < image_mark.shape[1] and image_mark[y,xscan_a] == 128:
-                                    # found border
-                                    if evenodd % 2 == 0:
-                                        start = (x * pixel_size, y * pixel_size)
-                                        ## direct gcode
-                                        ## code += [self.interface.rapid_move(start[0] - dXY[0], start[1] - dXY[1])]
-                                    else:
-                                        draw_line(image_fill, start + dXY, (x_b * pixel_size, y * pixel_size) + dXY, fill_color)
-                                        ## direct gcode
-                                        ## code += [self.interface.linear_move(x_b * pixel_size - dXY[0], y * pixel_size - dXY[1])]
-                                    evenodd = evenodd + 1
-                                #if x_b > x:
-                                x = x_b - 1
-                            x += 1
-                    else:
-                        # scan to the left
-                        start = None
-                        x = image_mark.shape[1] - 1
-                        while x >= 0:
-                            if image_mark[y,x] == 10:
-                                # found a border
-                                ## direct gcode
-                                ## update line below, to be able to skip empty (value 255) pixels
-                                # scan border, possibly having multiple pixels.
-                                x_b = x
-                                while x_b >= 0 and image_mark[y,x_b] == 10:
-                                    x_b -= 1
-
-                                xscan_b = x_b
-                                while xscan_b > 0 and xscan_b > (x_b - scan_error) and (image_mark[y,xscan_b] != 10 and image_mark[y,xscan_b] != 128):
-                                    xscan_b -= 1
-                                xscan_a = x + 1
-                                while xscan_a < image_mark.shape[1] and xscan_a < (x + scan_error) and (image_mark[y,xscan_a] != 10 and image_mark[y,xscan_a] != 128):
-                                    xscan_a += 1
-
-                                if xscan_a < image_mark.shape[1] and image_mark[y,xscan_a] == 128:
-                                    # found border
-                                    if evenodd % 2 == 0:
-                                        start = (x * pixel_size, y * pixel_size)
-                                        ## direct gcode
-                                        ## code += [self.interface.rapid_move(start[0] - dXY[0], start[1] - dXY[1])]
-                                    else:
-                                        draw_line(image_fill, start + dXY, (x * pixel_size, y * pixel_size) + dXY, fill_color)
-                                        ## direct gcode
-                                        ## code += [self.interface.linear_move(x * pixel_size - dXY[0], y * pixel_size - dXY[1])]
-                                    evenodd = evenodd + 1
-                                if xscan_b >= 0 and image_mark[y,xscan_b] == 128:
-                                    # found border
-                                    if evenodd % 2 == 0:
-                                        start = (x * pixel_size, y * pixel_size)
-                                        ## direct gcode
-                                        ## code += [self.interface.rapid_move(start[0] - dXY[0], start[1] - dXY[1])]
-                                    else:
-                                        draw_line(image_fill, start + dXY, (x_b * pixel_size, y * pixel_size) + dXY, fill_color)
-                                        ## direct gcode
-                                        ## code += [self.interface.linear_move(x_b * pixel_size - dXY[0], y * pixel_size - dXY[1])]
-                                    evenodd = evenodd + 1
-                                #if x_b < x:
-                                x = x_b + 1
-                            x -= 1
-
-                    # switch scan direction
-                    go_right = not go_right
-
-                ## direct gcode
-                ## self.body.extend(code)
-
-                ## direct gcode: ignore this step
-                # step 4: draw white borders to erase fill overlap
-
-                # 4a: make half steps to 'completely' erase the overlap
-                halfsteps = copy.deepcopy(steps)
-                for step in steps:
-                    if step:
-                        sign = -1 if step >= 0 else 1
-                        halfsteps.append(round(step + sign * pixel_size/2, self.precision))
-
-                # 4b: erase
-                for line_chain in path_curves[name_id]:
-                    for step in halfsteps:
-                        if step:
-                            delta_chain = LineSegmentChain.delta_chain(line_chain, step)
-                            for line in delta_chain:
-                                draw_line(image_fill, line.start + vdXY, line.end + vdXY, 0)
-                        else:
-                            for line in line_chain:
-                                draw_line(image_fill, line.start + vdXY, line.end + vdXY, 0)
-
-                ## direct gcode: ignore this step
-                # step 5: filter stray pixels (to remove noise from the action above)
-                for y in range(image_fill.shape[0]):
-                    for x in range(image_fill.shape[1]):
-                        if image_fill[y,x] != 0:
-                            if x > 1 and x < (image_fill.shape[1] - 1) and y > 1 and y < (image_fill.shape[0] - 1):
-                                if image_fill[y,x+1] == 0 and image_fill[y,x-1] == 0 and image_fill[y+1,x] == 0 and image_fill[y-1,x] == 0:
-                                    image_fill[y,x] = 0
-
-                ## direct gcode: ignore this step
-                # step 6: generate gcode from image_fill
-                img_attrib = {}
-                img_attrib['id'] = name_id
-                # Set speedmove to a short distance to be able to view it correctly using a viewer like LaserWeb.
-                # (image2gcode converts movements without writing to 'G1 S0' gcodes which viewers show in a specific
-                #  writing color, speedmoves uses gcode G0 to move without writing which viewers show in another color)
-                #img_attrib['gcode_speedmoves'] = 0.1
-                img_attrib['x'] = -dXY[0]
-                img_attrib['y'] = -dXY[1]
-                img_attrib['invert'] = False
-
-                ## direct gcode: ignore this step
-                # start gcode fill
-                self.image2gcode(img_attrib, image_fill)
+            #if not nofill and fill_color is not None and boundingbox.get() is not None:
+            if not nofill and fill_color is not None:
+                if processes > 1:
+                    # (send the line segments only, a worker does not need the path attributes)
+                    jobs.append(('fill_path', (name_id, [line_chain.segments() for line_chain in path_curves[name_id]],
+                                               steps, fill_color, boundingbox)))
+                else:
+                    self.fill_path(name_id, path_curves[name_id], steps, fill_color, boundingbox)
+
+        if jobs:
+            # (the workers are stopped when leaving the with statement, also on errors)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                                        initargs=(type(self.interface), self.params, self.svg_file_name)) as pool:
+                jobs = [pool.submit(_worker_call, method, *args) for method, args in jobs]
+                # (image gcode comes before the fill gcode)
+                for image in local_images:
+                    self.append_image(image.image, image.img_attrib, image.transformation)
+                for job in jobs:
+                    gcode, bbox = job.result()
+                    self.gcode += gcode
+                    if bbox is not None:
+                        self.boundingbox.update(bbox[0])
+                        self.boundingbox.update(bbox[1])
+
+        # (delta chains are only shared within one drawing)
+        self._delta_chains.clear()
+        self._shape_delta_chains.clear()
+
+    @staticmethod
+    def nearest_path_order(path_curves: dict[str, list[LineSegmentChain]]) -> list[str]:
+        """
+        Return the 'name_id's of path_curves in nearest neighbor order (setting 'optimize_path_order'): starting at the
+        origin, the next path is the path that starts closest to the end of the previous one. This shortens the moves
+        between paths (in document order, consecutive paths can be far apart).
+        Paths with equal distances keep their document order.
+
+        :param path_curves: line chains by 'name_id' (in document order).
+        :return: list of 'name_id's.
+        """
+        name_ids = [name_id for name_id in path_curves if path_curves[name_id]]
+        if len(name_ids) < 2:
+            return list(path_curves)
+
+        # start of the first and end of the last line chain of each path
+        starts = np.array([tuple(path_curves[name_id][0].get(0).start) for name_id in name_ids], dtype=np.float64)
+        ends = np.array([tuple(path_curves[name_id][-1].get(-1).end) for name_id in name_ids], dtype=np.float64)
+
+        # (paths without line chains have nothing to draw, keep them in front)
+        order = [name_id for name_id in path_curves if not path_curves[name_id]]
+        distance_to = np.empty(len(name_ids))
+        drawn = np.zeros(len(name_ids), dtype=bool)
+        position = np.zeros(2)
+        for _ in range(len(name_ids)):
+            np.hypot(starts[:,0] - position[0], starts[:,1] - position[1], out=distance_to)
+            distance_to[drawn] = np.inf
+            nearest = int(np.argmin(distance_to))
+            drawn[nearest] = True
+            order.append(name_ids[nearest])
+            position = ends[nearest]
+
+        return order
 
     def check_axis_maximum_travel(self):
         return self.settings["x_axis_maximum_travel"] is not None and self.settings["y_axis_maximum_travel"] is not None
@@ -1135,14 +1404,38 @@ class Compiler:
         :return true when box is in machine area bounds, false otherwise
         """
 
-        if self.settings["distance_mode"] == "absolute" and self.check_axis_maximum_travel() and self.boundingbox.get():
-            machine_max = Vector(self.settings["x_axis_maximum_travel"],self.settings["y_axis_maximum_travel"])
-            bbox = self.boundingbox.get()
+        settings = self.settings
+        bbox = self.boundingbox.get()
+        if settings["distance_mode"] == "absolute" and self.check_axis_maximum_travel() and bbox:
+            unit_scale = 25.4 if settings["unit"] == "inch" else 1
 
             # bbox[0] == lowerleft, bbox[1] == uperright, bbox[0/1][0] == x, bbox[0/1][1] == y
             #      lower left x and y >= 0 and upperright x and y <= resp. machine max x and y
             return (bbox[0][0] >= 0 and bbox[0][1] >=0
-                    and bbox[1][0] * (25.4 if self.settings["unit"] == "inch" else 1) <= machine_max.x
-                    and bbox[1][1] * (25.4 if self.settings["unit"] == "inch" else 1) <= machine_max.y)
+                    and bbox[1][0] * unit_scale <= settings["x_axis_maximum_travel"]
+                    and bbox[1][1] * unit_scale <= settings["y_axis_maximum_travel"])
 
         return False
+
+# compiler of a worker process (see Compiler.append_curves)
+_worker_compiler = None
+
+def _init_worker(interface_class: Interface, params: dict[str, Any], svg_file_name: str):
+    """
+    Create the compiler of a worker process.
+    """
+    global _worker_compiler
+    _worker_compiler = Compiler(interface_class, params=params)
+    _worker_compiler.svg_file_name = svg_file_name
+
+def _worker_call(method: str, *args) -> tuple[list[str], Any]:
+    """
+    Call a compiler method that adds image gcode (append_image or fill_path) in a worker process.
+    Returns the image gcode and its bounding box.
+    """
+    _worker_compiler.gcode = []
+    _worker_compiler.boundingbox = Boundingbox()
+    # (line chain ids are only unique within one call)
+    _worker_compiler._delta_chains.clear()
+    getattr(_worker_compiler, method)(*args)
+    return _worker_compiler.gcode, _worker_compiler.boundingbox.get()
@@ -0,0 +1,251 @@
+import math
+
+from typing import Any, Tuple
+
+import numpy as np
+
+from image2gcode.image2gcode import Image2gcode
+
+
+class RunLengthImage2gcode(Image2gcode):
+    """
+    Image2gcode that handles pixel runs (pixels of equal laser power) instead of single pixels.
+
+    The gcode is the same as the gcode of Image2gcode: Image2gcode only emits gcode when the laser power changes, so
+    the laser power of all pixels of a scan line is calculated at once (numpy) and only the pixels where the power
+    changes are handled one by one.
+    Note that a custom power function (see Image2gcode) is applied pixel by pixel (by Image2gcode itself).
+    This class uses attributes of Image2gcode (UPSTREAM_ATTRIBUTES), when a version of image2gcode does not have them,
+    Image2gcode converts the image itself.
+    """
+
+    UPSTREAM_ATTRIBUTES = ('_power', '_transformation', 'bbox')
+
+    def distance(self, A: Tuple[float,float], B: Tuple[float,float]) -> float:
+        """
+        Pythagoras (see Image2gcode.distance)
+        """
+        return math.hypot(A[0] - B[0], A[1] - B[1])
+
+    def image2gcode(self, img: np.ndarray, args: dict[str, Any]) -> str:
+        """
+        :param img: image array (widthx,height), intensity values [0-255]
+        :param args: conversion settings (like pixelsize, speed, maxpower, ..)
+        :return: gcode for this img(age)
+
+        See Image2gcode.image2gcode.
+        """
+        if (not all(hasattr(self, attribute) for attribute in self.UPSTREAM_ATTRIBUTES)
+                or self._power is not getattr(Image2gcode, "linear_power", None) or img.dtype != np.uint8):
+            return super().image2gcode(img, args)
+
+        def XYdelta(XY: Tuple[float,float]) -> Tuple[float,float]:
+            """
+            This function does a transformation.
+            :param XY: point to transform
+            :return: transformation of XY
+            """
+            XYd = XY if self._transformation is None else self._transformation(XY)
+            return (round(XYd[0],XY_prec),round(XYd[1],XY_prec))
+
+        def handle_overscan_at_eol(lastnoise):
+            """
+            This functions is called at the end of a scan line.
+            It moves the laser head just after the last contour (point) of this line.
+            :param lastnoise: location of the last 'noise' point
+            """
+            nonlocal head
+
+            # we are at the end of a scan line
+            if args["overscan"] and head[1] == Y and lastnoise is not None:
+                # add a few pixels to be drawn past the (outer) contour of this image, to make the laser head moves
+                # a few pixels further in the same scan direction
+                if left2right:
+                    overscanpixels = min(round(head[0] + (args["overscan"] * args["pixelsize"]), XY_prec),
+                                         round(args["offset"][0] + (line_size * args["pixelsize"]), XY_prec))
+                else:
+                    overscanpixels = max(round(head[0] - (args["overscan"] * args["pixelsize"]), XY_prec),
+                                         round(args["offset"][0], XY_prec))
+
+                # get points after transformation (if any)
+                overscandelta, Yd = XYdelta((overscanpixels,Y))
+                # emit overscan pixels
+                gcode.append(f"X{overscandelta}Y{Yd}S{overscan}")
+
+                # head at this location
+                head = (overscanpixels,Y)
+
+        def handle_overscan_at_begin_of_line(lastnoise) -> str:
+            """
+            This functions is called at the beginning of a scan line.
+            It moves the laser head just before the first contour (point) of this line.
+            :param lastnoise: location of the last 'noise' point
+            :return: gcode to move the head to this location
+            """
+            code = ''
+            # we are at the beginning of a scan line
+            if args["overscan"] and head[1] != Y:
+                # the laser head is moved to this line, just a few pixels before the start of a contour of this image
+                if left2right:
+                    min_X = round(args["offset"][0], XY_prec)
+                    overscanpixels = round(lastnoise[0] - (args["overscan"] * args["pixelsize"]), XY_prec)
+                    overscanpixels = overscanpixels if overscanpixels > min_X else min_X
+                else:
+                    max_X = round(args["offset"][0] + (line_size * args["pixelsize"]), XY_prec)
+                    overscanpixels = round(lastnoise[0] + (args["overscan"] * args["pixelsize"]), XY_prec)
+                    overscanpixels = overscanpixels if overscanpixels < max_X else max_X
+
+                # get points after transformation (if any)
+                overscandelta, lastnoisedelta = XYdelta((overscanpixels,lastnoise[1]))
+
+                # go to overscan position
+                code = f"X{overscandelta}Y{lastnoisedelta}S0\n"
+            return code
+
+        def handle_lastnoise(lastnoise) -> str:
+            """
+            This functions is called to move the laser head to the correct location
+            before a point is emmitted.
+            :param lastnoise: location of the last 'noise' point
+            :return: gcode to move the head to this location
+            """
+            code = ""
+            if lastnoise:
+                # head is not at correct location, go there
+                XYlastnoise = XYdelta(lastnoise)
+                XYhead = XYdelta(head)
+
+                if args["speedmoves"] and (self.distance(XYhead,XYlastnoise) > args["speedmoves"]):
+                    # fast
+                    code = f"G0 X{XYlastnoise[0]}Y{XYlastnoise[1]}\nG1\n"
+                else:
+                    # normal speed
+                    code = handle_overscan_at_begin_of_line(lastnoise)
+                    code += f"X{XYlastnoise[0]}Y{XYlastnoise[1]}S{overscan}\n"
+
+                # update bounding box
+                bbox_X.append(XYlastnoise[0])
+                bbox_Y.append(XYlastnoise[1])
+            return code
+
+        # set X/Y-axis precision to number of digits after
+        XY_prec = len(str(args["pixelsize"]).split('.')[1])
+
+        # power of overscan pixels
+        overscan = "180" if (args["overscan"] and args["showoverscan"]) else "0"
+
+        # set printer start coordinates
+        X0 = round(args["offset"][0], XY_prec)
+        Y = round(args["offset"][1], XY_prec)
+
+        # get coordinates after transformation (if any)
+        Xd, Yd = XYdelta((X0,Y))
+
+        # go to start
+        gcode = [f"G0X{Xd}Y{Yd}"]
+        # current location of laser head
+        head = (X0,Y)
+
+        # initiate bbox
+        # (the bbox is updated with the extremes of all points at the end, instead of point by point; note that min()
+        #  and max() keep the first of equal values, like Boundingbox.update does)
+        bbox_X = [Xd]
+        bbox_Y = [Yd]
+
+        # set write speed and G1 move mode
+        gcode.append(f"G1F{args['speed']}")
+
+        # laser power of all pixel values (see Image2gcode.linear_power)
+        maxpower, poweroffset = args["maxpower"], args["poweroffset"]
+        pixel = np.arange(256) / 255
+        if args["invert"]:
+            powers = (poweroffset + np.round((1.0 - pixel) * (maxpower - poweroffset))).astype(np.int64)
+        else:
+            powers = np.round(pixel * (maxpower - poweroffset)).astype(np.int64)
+        noise = args["noise"]
+
+        # Determine scan direction
+        onedirectionscan = args.get("onedirectionscan", False)
+        left2right = True
+
+        # X location (in pixels from X0) at the start of a scan line, and its coordinate
+        # (note that this coordinate stays X0 - possibly an int - until the head is moved)
+        start = 0
+        X_start = X0
+
+        # line size, including the line terminator (see Image2gcode.image2gcode)
+        line_size = img.shape[1] + 1
+
+        # start image conversion
+        for line in img:
+
+            if not left2right:
+                # reverse line when printing right to left
+                line = line[::-1]
+
+            # laser power of the line pixels and the line terminator (a 0 pixel)
+            line_power = powers[np.append(line, 0)]
+
+            # pixel locations where the power changes and the end of the line, with the power of the pixels
+            # before that location (the power of a run of pixels)
+            changes = np.flatnonzero(line_power[1:] != line_power[:-1]) + 1
+            if changes.size == 0 or changes[-1] != line_size - 1:
+                changes = np.append(changes, line_size - 1)
+            run_power = line_power[changes - 1]
+
+            # set last noise location on start of the line
+            lastnoise = (X_start, Y)
+
+            step = 1 if left2right else -1
+            for count, prev_pow in zip(changes.tolist(), run_power.tolist()):
+                X = round(X0 + (start + step * count) * args["pixelsize"], XY_prec) if count else X_start
+
+                # skip all zero power points
+                if prev_pow > noise:
+
+                    # check if head is at the right location, if not go there
+                    code = handle_lastnoise(lastnoise)
+
+                    # emit point
+                    if self._transformation is not None:
+                        Xd, Yd = XYdelta((X,Y))
+                        code += f"X{Xd}Y{Yd}S{prev_pow}"
+                        # update bbox
+                        bbox_X.append(Xd)
+                        bbox_Y.append(Yd)
+                    else:
+                        code += f"X{X}S{prev_pow}"
+                        # update bbox
+                        bbox_X.append(X)
+                        bbox_Y.append(Y)
+                    gcode.append(code)
+
+                    # head at this location
+                    head = (X,Y)
+                    lastnoise = None
+                else:
+                    # didn't move head to location, save it
+                    lastnoise = (X,Y)
+
+            # overscan this line (if we can)
+            handle_overscan_at_eol(lastnoise)
+
+            # next scan line (defer head movement)
+            Y = round(Y + args["pixelsize"], XY_prec)
+
+            # If onedirectionscan is True, always scan left to right
+            # Otherwise, alternate direction
+            if onedirectionscan:
+                # Go to line start & do not switch scan direction
+                start = 0
+                X_start = X0
+            else:
+                if line_size > 1:
+                    start += step * (line_size - 1)
+                    X_start = round(X0 + start * args["pixelsize"], XY_prec)
+                left2right = not left2right
+
+        self.bbox.update((min(bbox_X), min(bbox_Y)))
+        self.bbox.update((max(bbox_X), max(bbox_Y)))
+
+        return '\n'.join(gcode)
@@ -3,6 +3,7 @@
     currently only partially implemented
     (definition from  https://www.w3.org/TR/css-color-3/)
 """
+import functools
 import logging
 import math
 import re
@@ -11,6 +12,11 @@ logging.basicConfig(format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# color notations (the capture group is the color value)
+_HEX_COLOR = re.compile(r'#([A-Fa-f0-9]+)')
+_RGB_COLOR = re.compile(r'rgba?\(([0-9]+,[0-9]+,[0-9]+(?:,(?:\d*\.)?\d+)?)')
+_HSL_COLOR = re.compile(r'hsla?\(([0-9]+,[0-9]+,[0-9]+(?:,(?:\d*\.)?\d+)?)')
+
 css_color_keywords = {
     "aliceblue": { "hex": "#F0F8FF", "decimal": [240,248,255] },
     "antiquewhite": { "hex": "#FAEBD7", "decimal": [250,235,215] },
@@ -161,6 +167,9 @@ css_color_keywords = {
     "yellowgreen": { "hex": "#9ACD32", "decimal": [154,205,50] },
 }
 
+# keyword colors as rgb tuples (the parse result of a keyword)
+_KEYWORD_RGB = {keyword: tuple(value["decimal"]) for keyword, value in css_color_keywords.items()}
+
 def hsl2rgb(hue, sat, light) -> [int,int,int]:
     """
         Convert 'hsl(' color notation to rgb.
@@ -183,42 +192,39 @@ def hsl2rgb(hue, sat, light) -> [int,int,int]:
 
     return [f(0), f(8), f(4)]
 
-def hex2rgb(hexcolor: str) -> [int,int,int]:
+def hex2rgb(hexcolor: str) -> (int,int,int):
 
     rgbcolor = int(hexcolor, 16)
     r = rgbcolor >> 16
     g = rgbcolor >> 8 & 255
     b = rgbcolor & 255
 
-    return [r,g,b]
+    return (r,g,b)
 
-def parse_css_color(color: str) -> [int,int,int,float]:
+@functools.lru_cache(maxsize=1024)
+def parse_css_color(color: str) -> (int,int,int,float):
     """
         parse css color to rgb
         (definition from  https://www.w3.org/TR/css-color-3/)
 
         accept '#hex', 'rgb(', 'rgba(', 'hsl(' and 'hsla(' color schemes.
+        Note that results are cached (and shared), so they are returned as (immutable) tuples.
     """
-    float_re = '(\d*\.)?\d+'
-    rgbcolor = 0
-
-    if color in css_color_keywords:
-        rgbcolor = css_color_keywords[color]["decimal"]
-    else:
-        hexcolor = re.search('#[A-Fa-f0-9]+', color)
+    rgbcolor = _KEYWORD_RGB.get(color, 0)
+    if not rgbcolor:
+        hexcolor = _HEX_COLOR.search(color)
         if hexcolor:
-            hexcolor = re.search('[A-Fa-f0-9]+', hexcolor.group(0)).group(0)
+            hexcolor = hexcolor.group(1)
             if len(hexcolor) == 3:
                 hexcolor = hexcolor[0] + hexcolor[0] + hexcolor[1] + hexcolor[1] + hexcolor[2] + hexcolor[2]
 
             rgbcolor = hex2rgb(hexcolor)
         else:
-            rgba = re.search(f"rgb(a)?\([0-9]+,[0-9]+,[0-9]+(,{float_re})?", color)
-            # '(\d*\.)?\d+'
+            rgba = _RGB_COLOR.search(color)
             if rgba:
                 # set alpha to non transparant
                 a = 1
-                rgb = re.search(f"\([0-9]+,[0-9]+,[0-9]+(,{float_re})?", rgba.group(0)).group(0)[1:]
+                rgb = rgba.group(1)
 
                 commas_pos = [cpos for cpos, char in enumerate(rgb) if char == ',']
                 r = int(rgb[0:commas_pos[0]])
@@ -230,14 +236,14 @@ def parse_css_color(color: str) -> [int,int,int,float]:
                     b = int(rgb[commas_pos[1]+1:])
 
                 #rgbcolor = [r * a, g * a, b * a]
-                rgbcolor = [r,g,b,a]
+                rgbcolor = (r,g,b,a)
 
             else:
-                hsla = re.search(f"hsl(a)?\([0-9]+,[0-9]+,[0-9]+(,{float_re})?", color)
+                hsla = _HSL_COLOR.search(color)
                 if hsla:
                     # set alpha to non transparant
                     a = 1
-                    hsl = re.search(f"\([0-9]+,[0-9]+,[0-9]+(,{float_re})?", hsla.group(0)).group(0)[1:]
+                    hsl = hsla.group(1)
 
                     commas_pos = [cpos for cpos, char in enumerate(hsl) if char == ',']
                     h = int(hsl[0:commas_pos[0]])
@@ -250,11 +256,11 @@ def parse_css_color(color: str) -> [int,int,int,float]:
                         l = int(hsl[commas_pos[1]+1:])
 
                     rgbcolor = hsl2rgb(h, s, l)
-                    rgbcolor = [int(rgbcolor[0] * 255), int(rgbcolor[1] * 255), int(rgbcolor[2] * 255), a]
+                    rgbcolor = (int(rgbcolor[0] * 255), int(rgbcolor[1] * 255), int(rgbcolor[2] * 255), a)
 
     if not rgbcolor:
         logger.warn(f"Not a valid css color: '{color}', color set to 'white'!")
-        rgbcolor = css_color_keywords['white']["decimal"]
+        rgbcolor = _KEYWORD_RGB['white']
 
     return rgbcolor
 
@@ -262,11 +268,11 @@ def rgb24tobw24(rgb24: int) -> int:
     """
         convert a 24 bit rgb (color) value to 24 bit grayscale
     """
-    r = col >> 16;
-    g = (col >> 8) & 0xff;
-    b = col & 0xff;
-    bnw = int(r * 0.299 + g * 0.587 + b * 0.114) & 0xff;
-    return (bnw << 16) | (bnw << 8) | bnw;
+    r = rgb24 >> 16
+    g = (rgb24 >> 8) & 0xff
+    b = rgb24 & 0xff
+    bnw = int(r * 0.299 + g * 0.587 + b * 0.114) & 0xff
+    return (bnw << 16) | (bnw << 8) | bnw
 
 def rgb24tobw8(rgb24: [int,int,int,float]) -> int:
     """
@@ -280,6 +286,7 @@ def rgb24equal(rgb24, rgb24_2) -> bool:
     """
     return (rgb24[0] == rgb24_2[0]) and (rgb24[1] == rgb24_2[1]) and (rgb24[2] == rgb24_2[2])
 
+@functools.lru_cache(maxsize=1024)
 def parse_css_color2bw8(color: str) -> int:
     """
     parse css color string to 8 bit b&w value
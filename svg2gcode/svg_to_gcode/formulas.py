@@ -52,8 +52,8 @@ def line_intersect(p1, c1, p2, c2):
 def line_length(A: (float,float),B: (float,float)):
     """ Pythagoras """
     # |Ax - Bx|^2 + |Ay - By|^2 = C^2
-    # distance = √C^2
-    return math.sqrt((A[0] - B[0])**2 + (A[1] - B[1])**2)
+    # distance = √C^2 (math.hypot does this in one call)
+    return math.hypot(A[0] - B[0], A[1] - B[1])
 
 def is_on_mid_perpendicular(z, a, b):
     """Check if a point z is on the line which is perpendicular to ab and passes through the segment's midpoint"""
@@ -19,15 +19,22 @@ class CubicBazier(Curve):
         return f"CubicBazier(start: {self.start}, end: {self.end}, control1: {self.control1}, control2: {self.control2}, attrib: {self.path_attrib})"
 
     def point(self, t):
-        return (1-t)**3 * self.start +\
-               3 * (1-t)**2 * t * self.control1 +\
-               3 * (1-t) * t**2 * self.control2 +\
-               t**3 * self.end
+        # (computed per coordinate, the result is the same as the Vector expression, without intermediate Vectors)
+        b0 = (1-t)**3
+        b1 = 3 * (1-t)**2 * t
+        b2 = 3 * (1-t) * t**2
+        b3 = t**3
+        start, control1, control2, end = self.start, self.control1, self.control2, self.end
+        return Vector(b0 * start.x + b1 * control1.x + b2 * control2.x + b3 * end.x,
+                      b0 * start.y + b1 * control1.y + b2 * control2.y + b3 * end.y)
 
     def derivative(self, t):
-        return 3 * (1-t)**2 * (self.control1 - self.start) +\
-               6 * (1-t) * t * (self.control2 - self.control1) +\
-               3 * t**2 * (self.end - self.control2)
+        b0 = 3 * (1-t)**2
+        b1 = 6 * (1-t) * t
+        b2 = 3 * t**2
+        start, control1, control2, end = self.start, self.control1, self.control2, self.end
+        return Vector(b0 * (control1.x - start.x) + b1 * (control2.x - control1.x) + b2 * (end.x - control2.x),
+                      b0 * (control1.y - start.y) + b1 * (control2.y - control1.y) + b2 * (end.y - control2.y))
 
     def sanity_check(self):
         pass
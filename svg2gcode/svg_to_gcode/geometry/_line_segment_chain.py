@@ -1,6 +1,93 @@
+import math
+
+import numpy as np
+
 from svg2gcode.svg_to_gcode.geometry import Chain
 from svg2gcode.svg_to_gcode.geometry import Curve, Line, Vector
 from svg2gcode.svg_to_gcode import TOLERANCES
+from svg2gcode.svg_to_gcode.jit import njit
+
+
+@njit(cache=True)
+def _line_intersection(x1: float, y1: float, x2: float, y2: float, x3: float, y3: float, x4: float, y4: float,
+                       precision: int) -> (bool, float, float):
+    """
+    Line intersection of line (x1,y1)-(x2,y2) and line (x3,y3)-(x4,y4), see Line.line_intersection.
+    Return (intersects, x, y), intersects is false when the lines do not intersect.
+    """
+    # denominator
+    d = (x1 - x2)*(y3 - y4) - (y1 - y2)*(x3 - x4)
+
+    # Note that the cutoff below is needed to eliminate propagation of rounding errors.
+    if abs(d) < 10.0**-precision:
+        return False, 0.0, 0.0
+
+    # (rounded as np.round does)
+    scale = 10.0**precision
+    a = x1*y2 - y1*x2
+    b = x3*y4 - y3*x4
+    return (True, np.rint((a * (x3 - x4) - (x1 - x2) * b)/d * scale) / scale,
+                  np.rint((a * (y3 - y4) - (y1 - y2) * b)/d * scale) / scale)
+
+@njit(cache=True)
+def _delta_segments(segments: np.ndarray, offset: float, precision: int) -> np.ndarray:
+    """
+    Return line segments (x1, y1, x2, y2) offset perpendicular to the given line segments, consecutive segments
+    connected at their intersection (see LineSegmentChain.delta_chain). The offset points outwards for a clockwise
+    rotation (when positive). Line segments of length zero are not moved.
+    """
+    n = segments.shape[0]
+    scale = 10.0**precision
+
+    # offset the line segments
+    offset_segments = np.empty((n, 4))
+    for i in range(n):
+        x1, y1, x2, y2 = segments[i,0], segments[i,1], segments[i,2], segments[i,3]
+        d_x = x2 - x1
+        d_y = y2 - y1
+        length = math.hypot(d_x, d_y)
+
+        # unit vector perpendicular to the line segment, times the offset (rounded as np.round does)
+        delta_x = 0.0
+        delta_y = 0.0
+        if length > 0:
+            delta_x = np.rint((-d_y * offset) / length * scale) / scale
+            delta_y = np.rint((d_x * offset) / length * scale) / scale
+
+        offset_segments[i,0] = x1 + delta_x
+        offset_segments[i,1] = y1 + delta_y
+        offset_segments[i,2] = x2 + delta_x
+        offset_segments[i,3] = y2 + delta_y
+
+    # connect each line segment and the next one at their intersection
+    delta_segments = np.empty((n, 4))
+    start_x = offset_segments[0,0]
+    start_y = offset_segments[0,1]
+    moved = False
+    for i in range(n):
+        x1, y1, x2, y2 = offset_segments[i,0], offset_segments[i,1], offset_segments[i,2], offset_segments[i,3]
+        delta_segments[i,0] = start_x
+        delta_segments[i,1] = start_y
+        delta_segments[i,2] = x2
+        delta_segments[i,3] = y2
+
+        if i + 1 < n:
+            if moved:
+                # the start of this line segment is moved (see below), so its intersection with the next one is too
+                x1, y1 = start_x, start_y
+            intersects, x, y = _line_intersection(x1, y1, x2, y2, offset_segments[i + 1,0], offset_segments[i + 1,1],
+                                                  offset_segments[i + 1,2], offset_segments[i + 1,3], precision)
+            if intersects:
+                # set end of this line segment and start of the next one to the intersection
+                delta_segments[i,2] = x
+                delta_segments[i,3] = y
+                start_x, start_y = x, y
+            else:
+                # connect the next line segment
+                start_x, start_y = x2, y2
+            moved = not intersects
+
+    return delta_segments
 
 
 class LineSegmentChain(Chain):
@@ -19,7 +106,8 @@ class LineSegmentChain(Chain):
             line1 = self._curves[-1]
 
             # Assert continuity
-            if abs(line1.end - line2.start) > TOLERANCES['input']:
+            # (the distance of the end and start points, without a Vector subtraction)
+            if math.hypot(line1.end.x - line2.start.x, line1.end.y - line2.start.y) > TOLERANCES['input']:
                 raise ValueError(f"The end of the last line is different from the start of the new line"
                                  f"|{line1.end} - {line2.start}| >= {TOLERANCES['input']}")
 
@@ -28,62 +116,63 @@ class LineSegmentChain(Chain):
 
         self._curves.append(line2)
 
-    @staticmethod
-    def clockwise(line_chain, delta: float = .1) -> bool:
+    def endpoints(self) -> np.ndarray:
         """
-        Return true when line chain rotates clockwise using sample delta
+        Return the end points of all line segments of the chain as an array of shape (chain_size, 2) holding (x, y)
+        rows. Note that the start of a line segment is the end of the previous one, so only the start of the first
+        segment is missing.
+        """
+        return np.fromiter((xy for line in self._curves for xy in (line.end.x, line.end.y)),
+                           dtype=np.float64, count=2 * len(self._curves)).reshape(-1, 2)
 
+    def segments(self) -> np.ndarray:
+        """
+        Return all line segments of the chain as an array of shape (chain_size, 4) holding (x1, y1, x2, y2) rows.
         """
-        # bbox_line_chain = bbox(line_chain)
-        # bbox_delta_chain = bbox(delta_chain(line_chain, delta))
-        # if bbox_delta_chain > bbox_line_chain:
-        #       return true
-        # return false
-        pass
+        return np.fromiter((xy for line in self._curves for xy in (line.start.x, line.start.y, line.end.x, line.end.y)),
+                           dtype=np.float64, count=4 * len(self._curves)).reshape(-1, 4)
 
     @staticmethod
-    def delta_chain(line_chain, offset: float) -> "LineSegmentChain":
+    def from_segments(segments: np.ndarray) -> "LineSegmentChain":
         """
-        Return a line chain offset to the given chain. If the chain rotates clockwise a positive offset
-        results in a delta chain outwards of (enclosing) the given line chain.
-
+        Return a line chain of line segments (x1, y1, x2, y2), the reverse of segments (without path attributes).
         """
-        delta_chain = LineSegmentChain()
+        line_chain = LineSegmentChain()
+        for x1, y1, x2, y2 in segments.tolist():
+            line_chain.append(Line(Vector(x1, y1), Vector(x2, y2)))
+        return line_chain
 
+    @staticmethod
+    def clockwise(line_chain) -> bool:
+        """
+        Return true when line chain rotates clockwise (a positive delta offset is outside the line chain, see
+        delta_chain). Uses the sign of the (shoelace) area of the line chain, an open chain is closed by a line
+        from its end to its start.
+        """
+        start = line_chain.get(0).start
+        end = line_chain.get(-1).end
+        area = end.x * start.y - start.x * end.y
         for line in line_chain:
-            line_delta = Line.offset_line(offset, line)
-
-            if delta_chain.chain_size():
-                # calculate intersection of previous line and current line
-                intersect = Line.line_intersection(delta_chain.get(-1), line_delta)
-                if intersect is not None:
-                    # set prev_line.end to intersect
-                    prev_line = delta_chain.get(-1)
-                    prev_line.end = intersect
-                    delta_chain.set(-1, prev_line)
+            area += line.start.x * line.end.y - line.end.x * line.start.y
+        return area < 0
 
-                    # set line_delta start to intersect
-                    line_delta.start = intersect
-                else:
-                    # connect line, to prevent ValueErrors from delta_chain.append() below
-                    line_delta.start = delta_chain.get(-1).end
+    @staticmethod
+    def delta_chain(line_chain, offset: float, precision = 6) -> "LineSegmentChain":
+        """
+        Return a line chain offset to the given chain. If the chain rotates clockwise a positive offset
+        results in a delta chain outwards of (enclosing) the given line chain.
 
-            delta_chain.append(line_delta)
+        """
+        delta_chain = LineSegmentChain.from_segments(_delta_segments(line_chain.segments(), offset, precision))
 
         # check if line chain is a loop
         if line_chain.get(0).start == line_chain.get(-1).end:
             # fix delta chain
-            intersect = Line.line_intersection(delta_chain.get(0), delta_chain.get(-1))
+            intersect = Line.line_intersection(delta_chain.get(0), delta_chain.get(-1), precision)
             if intersect is not None:
-                # update start of loop
-                start_loop = delta_chain.get(0)
-                start_loop.start = intersect
-                delta_chain.set(0, start_loop)
-
-                # update end of loop
-                end_loop = delta_chain.get(-1)
-                end_loop.end = intersect
-                delta_chain.set(-1, end_loop)
+                # update start and end of loop (in place)
+                delta_chain.get(0).start = intersect
+                delta_chain.get(-1).end = intersect
 
         return delta_chain
 
@@ -20,10 +20,19 @@ class QuadraticBezier(Curve):
         return f"QuadraticBezier(start: {self.start}, end: {self.end}, control: {self.control}, attrib: {self.path_attrib})"
 
     def point(self, t):
-        return self.control + ((1 - t)**2) * (self.start - self.control) + (t**2) * (self.end - self.control)
+        # (computed per coordinate, the result is the same as the Vector expression, without intermediate Vectors)
+        b0 = (1 - t)**2
+        b1 = t**2
+        start, control, end = self.start, self.control, self.end
+        return Vector(control.x + b0 * (start.x - control.x) + b1 * (end.x - control.x),
+                      control.y + b0 * (start.y - control.y) + b1 * (end.y - control.y))
 
     def derivative(self, t):
-        return 2 * (1 - t) * (self.control - self.start) + 2 * t * (self.end - self.control)
+        b0 = 2 * (1 - t)
+        b1 = 2 * t
+        start, control, end = self.start, self.control, self.end
+        return Vector(b0 * (control.x - start.x) + b1 * (end.x - control.x),
+                      b0 * (control.y - start.y) + b1 * (end.y - control.y))
 
     def sanity_check(self):
         # ToDo verify if self.start == self.end forms a valid curve under the svg standard
@@ -1,3 +1,6 @@
+import math
+
+
 class Vector:
     """The Vector class is a simple representation of a 2D vector."""
 
@@ -34,7 +37,7 @@ class Vector:
         return Vector.scalar_product(self, 1/other)
 
     def __abs__(self):
-        return (self.x ** 2 + self.y ** 2) ** 0.5
+        return math.hypot(self.x, self.y)
 
     def __iter__(self):
         yield from (self.x, self.y)  # ignore your editor, these parentheses are not redundant
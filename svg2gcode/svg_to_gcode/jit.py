@@ -0,0 +1,15 @@
+"""
+Optional just-in-time compilation of numerical functions.
+
+When numba (https://numba.pydata.org) is installed, functions decorated with 'njit' are compiled to machine code on
+first use. Otherwise 'njit' leaves functions untouched and they run as plain python (same results, only slower).
+"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: return the function as is."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
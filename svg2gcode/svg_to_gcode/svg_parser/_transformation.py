@@ -133,12 +133,12 @@ class Transformation:
         Apply the full affine transformation (linear + translation) to a vector. Generally used to transform points.
         Eg the center of an ellipse.
         """
-        # cast
-        vector = Vector(*vector)
-        vector_4d = Matrix([[vector.x], [vector.y], [1], [1]])
-        vector_4d = self.translation_matrix * vector_4d
+        x, y = vector
 
-        return Vector(vector_4d.matrix_list[0][0], vector_4d.matrix_list[1][0])
+        # translation_matrix * [x, y, 1, 1] (only the x and y rows, without creating matrices; sums like Matrix does)
+        row_x, row_y = self.translation_matrix.matrix_list[:2]
+        return Vector(sum([row_x[0] * x, row_x[1] * y, row_x[2], row_x[3]]),
+                      sum([row_y[0] * x, row_y[1] * y, row_y[2], row_y[3]]))
 
     def apply_linear_transformation(self, vector: Vector) -> Vector:
         """
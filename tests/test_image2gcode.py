@@ -0,0 +1,67 @@
+"""
+RunLengthImage2gcode must emit exactly the gcode (and boundingbox) of the upstream Image2gcode.
+
+Run: python -m unittest discover tests
+"""
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from image2gcode.image2gcode import Image2gcode
+from svg2gcode.svg_to_gcode.compiler._image2gcode import RunLengthImage2gcode
+
+
+def rotate(XY):
+    angle = 0.3
+    return (XY[0] * math.cos(angle) - XY[1] * math.sin(angle) + 5, XY[0] * math.sin(angle) + XY[1] * math.cos(angle))
+
+def conversion_args(**settings) -> dict:
+    args = {"pixelsize": 0.1, "maxpower": 300, "poweroffset": 0, "speed": 800, "noise": 0, "speedmoves": 0,
+            "overscan": 0, "showoverscan": False, "offset": (0, 0), "name": "test", "invert": True}
+    args.update(settings)
+    return args
+
+def images() -> list[np.ndarray]:
+    rng = np.random.default_rng(1)
+    return [
+        # noise
+        rng.integers(0, 256, (8, 25)).astype(np.uint8),
+        # runs of equal pixels (and empty lines)
+        np.repeat(rng.choice(np.array([0, 0, 255, 128, 10], np.uint8), (6, 5)), 4, axis=1),
+        # single pixel
+        np.array([[200]], dtype=np.uint8),
+    ]
+
+
+class TestRunLengthImage2gcode(unittest.TestCase):
+
+    def assertSameConversion(self, img: np.ndarray, args: dict, transformation=None):
+        upstream = Image2gcode(transformation=transformation)
+        run_length = RunLengthImage2gcode(transformation=transformation)
+        self.assertEqual(run_length.image2gcode(img, args), upstream.image2gcode(img, args))
+        self.assertEqual(repr(run_length.bbox.get()), repr(upstream.bbox.get()))
+
+    def test_same_gcode(self):
+        for settings in [{},
+                         {"invert": False, "poweroffset": 20},
+                         {"noise": 5, "speedmoves": 0.5, "offset": (12.34, 5.55)},
+                         {"overscan": 3, "showoverscan": True, "pixelsize": 0.25},
+                         {"onedirectionscan": True, "maxpower": 1000}]:
+            for img in images():
+                for transformation in (None, rotate):
+                    with self.subTest(settings=settings, shape=img.shape, transformation=transformation):
+                        self.assertSameConversion(img, conversion_args(**settings), transformation)
+
+    def test_upstream_fallback(self):
+        # image2gcode versions without the attributes used by RunLengthImage2gcode convert the image themselves
+        img = images()[0]
+        with mock.patch.object(RunLengthImage2gcode, "UPSTREAM_ATTRIBUTES", ("_renamed",)), \
+             mock.patch.object(Image2gcode, "image2gcode", return_value="upstream") as upstream:
+            self.assertEqual(RunLengthImage2gcode().image2gcode(img, conversion_args()), "upstream")
+            upstream.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()